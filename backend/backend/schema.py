@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework import permissions
+from drf_yasg.views import get_schema_view
+from drf_yasg import openapi
+
+# API description shared by the live schema views and `manage.py generate_swagger`
+api_info = openapi.Info(
+    title="Care Project API",
+    default_version="v1",
+    description=(
+        "API documentation for the Care Project. "
+        "This includes endpoints for managing clients, notes, caregivers, and care analytics."
+    ),
+    terms_of_service="https://www.careproject.com/terms/",
+    contact=openapi.Contact(email="support@careproject.com"),
+    license=openapi.License(name="MIT License"),
+)
+
+# Swagger schema view configuration
+schema_view = get_schema_view(
+    api_info,
+    public=True,
+    permission_classes=[permissions.AllowAny],
+)
+
+_live_schema_view = schema_view.without_ui(cache_timeout=settings.OPENAPI_SCHEMA_CACHE_TIMEOUT)
+
+_CONTENT_TYPES = {
+    ".json": "application/json",
+    ".yaml": "application/yaml",
+}
+
+# Schema files read from disk, keyed by format
+_schema_files = {}
+
+
+def cached_schema_view(request, format):
+    """
+    Serves the OpenAPI schema generated at build time (see the Dockerfile) so it
+    isn't rebuilt from the URL conf on every hit. Falls back to the live
+    drf_yasg view when no pre-generated file exists for the requested format.
+    """
+    if format not in _schema_files:
+        path = settings.OPENAPI_SCHEMA_DIR / f"openapi{format}"
+        _schema_files[format] = path.read_bytes() if path.exists() else None
+
+    content = _schema_files[format]
+    if content is None:
+        return _live_schema_view(request, format=format)
+    return HttpResponse(content, content_type=_CONTENT_TYPES[format])
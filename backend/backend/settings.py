@@ -14,6 +14,33 @@ SECRET_KEY = config('SECRET_KEY')
 DEBUG = config('DEBUG', default=False, cast=bool)
 REPLICATE_API_TOKEN = config('REPLICATE_API_TOKEN')
 
+# Model routing (see core/model_router.py). PROVIDER 'stub' answers locally
+# without calling Replicate, for development and tests.
+MODEL_ROUTING = {
+    'PROVIDER': config('MODEL_PROVIDER', default='replicate'),
+    'DEFAULT_MODEL': config('MODEL_DEFAULT', default='ibm-granite/granite-3.1-2b-instruct'),
+    'LARGE_MODEL': config('MODEL_LARGE', default='ibm-granite/granite-3.1-8b-instruct'),
+    'LARGE_PROMPT_CHARS': 4000,  # Prompts longer than this go to the large model
+    'LARGE_TEAM_SIZE': 10,  # So do projects with more team members than this
+    'LONG_TIMELINE_DAYS': 180,  # Or running longer than this
+    'LATENCY_BUDGET_SECONDS': config('MODEL_LATENCY_BUDGET', default=30, cast=float),
+    'LATENCY_PROBE_SECONDS': 300,  # A model over the budget still gets one request this often, so it can recover
+    'RACE': config('MODEL_RACE', default=False, cast=bool),  # Send each prompt to both models, keep the first valid result
+    'STUB_LATENCY_SECONDS': 0,  # Seconds, or a dict of model name -> seconds
+}
+
+# Local pre-screen before the analysis prompt (see core/prescreen.py). Projects
+# that break a basic rule, or whose probability of being rated feasible by the
+# trained model (`manage.py prescreen train`) is at most SHORT_CIRCUIT_BELOW,
+# get a provisional evaluation without a model call.
+PRESCREEN = {
+    'ENABLED': config('PRESCREEN_ENABLED', default=True, cast=bool),
+    'SHORT_CIRCUIT_BELOW': config('PRESCREEN_SHORT_CIRCUIT_BELOW', default=0.05, cast=float),
+    'FEASIBLE_SCORE': 5,  # Scores above this count as feasible when training (as in task generation)
+    'MIN_TRAINING_ROWS': 50,
+    'MODEL_PATH': config('PRESCREEN_MODEL_PATH', default=os.path.join(BASE_DIR, 'prescreen_model.json')),
+}
+
 ALLOWED_HOSTS = ["*"]
 
 # Application definition
@@ -24,6 +51,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     # Installed packages
     'rest_framework',
@@ -37,21 +65,54 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.log.RequestIdMiddleware',  # Tags log lines with a per-request correlation id
     'corsheaders.middleware.CorsMiddleware',  # Added for CORS
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.replicas.ReplicaRoutingMiddleware',  # Lets GET requests read from replicas
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.profiling.RequestProfilingMiddleware',  # Inactive unless PROFILING is configured
 ]
 
+# On-demand request profiling (see core/profiling.py). A request is profiled if
+# it sends "X-Profile: <PROFILING_TOKEN>", or at random with PROFILING_SAMPLE_RATE.
+PROFILING = {
+    'TOKEN': config('PROFILING_TOKEN', default=''),
+    'SAMPLE_RATE': config('PROFILING_SAMPLE_RATE', default=0.0, cast=float),
+    'INTERVAL_MS': config('PROFILING_INTERVAL_MS', default=5, cast=float),
+    'DIR': config('PROFILING_DIR', default=os.path.join(BASE_DIR, 'profiles')),
+}
+
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'core.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+}
+
+# Admission control for endpoints that call the model: a token bucket per user,
+# a global token bucket and a cap on generations running at the same time.
+MODEL_ADMISSION = {
+    'USER_BURST': config('MODEL_USER_BURST', default=5, cast=int),
+    'USER_PER_MINUTE': config('MODEL_USER_PER_MINUTE', default=2, cast=float),
+    'GLOBAL_BURST': config('MODEL_GLOBAL_BURST', default=20, cast=int),
+    'GLOBAL_PER_MINUTE': config('MODEL_GLOBAL_PER_MINUTE', default=30, cast=float),
+    'MAX_IN_FLIGHT': config('MODEL_MAX_IN_FLIGHT', default=4, cast=int),  # Leaves gunicorn threads free for reads
+    'IN_FLIGHT_TIMEOUT': 300,  # Seconds before an unfinished generation is considered abandoned
+    'IN_FLIGHT_RETRY_AFTER': 5,  # Retry-After (seconds) sent when the in-flight cap is reached
 }
 
 # JWT configuration
@@ -101,7 +162,30 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD'),
         'HOST': config('DB_HOST'),
         'PORT': config('DB_PORT'),
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),  # Keep connections open between requests
+        'CONN_HEALTH_CHECKS': True,  # Check persistent connections before reusing them
+    }
+}
+
+# Read replicas, as comma-separated host:port pairs (e.g. "localhost:5435").
+# They use the primary's database name and credentials. GET requests read from
+# a healthy replica (see core/replicas.py); everything else uses the primary.
+for index, replica in enumerate(filter(None, config('DB_REPLICA_HOSTS', default='').split(',')), start=1):
+    replica_host, _, replica_port = replica.strip().partition(':')
+    DATABASES[f'replica_{index}'] = {
+        **DATABASES['default'],
+        'HOST': replica_host,
+        'PORT': replica_port or DATABASES['default']['PORT'],
+        'OPTIONS': {'connect_timeout': 2},  # Fail over to the primary quickly
+        'TEST': {'MIRROR': 'default'},
     }
+
+DATABASE_ROUTERS = ['core.replicas.ReadReplicaRouter']
+
+REPLICAS = {
+    'PIN_SECONDS': config('DB_REPLICA_PIN_SECONDS', default=10, cast=int),  # Read-your-writes window after a write
+    'HEALTH_CHECK_INTERVAL': 10,  # Seconds between health checks of each replica
+    'MAX_LAG_SECONDS': config('DB_REPLICA_MAX_LAG', default=5, cast=float),
 }
 
 # Password validation
@@ -143,3 +227,81 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Generated task assignments: "repair" fixes invalid tasks before saving them,
+# "reject" discards the whole plan if any task is invalid.
+TASK_VALIDATION_MODE = config('TASK_VALIDATION_MODE', default='repair')
+
+# Compressed text fields (see core/compression.py). Values shorter than
+# MIN_LENGTH bytes are stored as is; the rest with zlib at LEVEL and the newest
+# dictionary trained by `manage.py train_compression_dictionary`.
+COMPRESSION = {
+    'MIN_LENGTH': 64,
+    'LEVEL': 6,
+    'DICTIONARY_SIZE': 16 * 1024,
+    'DICTIONARY_REFRESH_SECONDS': 300,  # How often workers check for a new dictionary
+}
+
+# Model call logging (see core/log.py). Every output's size is logged; a preview
+# truncated to OUTPUT_MAX_CHARS only for OUTPUT_SAMPLE_RATE of the calls. With
+# SPOOL_ENABLED the full outputs go to a rotating file capped at
+# SPOOL_MAX_BYTES * (SPOOL_BACKUPS + 1).
+MODEL_LOGGING = {
+    'LEVEL': config('MODEL_LOG_LEVEL', default='INFO'),
+    'OUTPUT_SAMPLE_RATE': config('MODEL_OUTPUT_SAMPLE_RATE', default=1.0 if DEBUG else 0.05, cast=float),
+    'OUTPUT_MAX_CHARS': config('MODEL_OUTPUT_MAX_CHARS', default=500, cast=int),
+    'SPOOL_ENABLED': config('MODEL_OUTPUT_SPOOL', default=DEBUG, cast=bool),
+    'SPOOL_PATH': config('MODEL_OUTPUT_SPOOL_PATH', default=os.path.join(BASE_DIR, 'logs', 'model_output.log')),
+    'SPOOL_MAX_BYTES': config('MODEL_OUTPUT_SPOOL_MAX_BYTES', default=10 * 1024 * 1024, cast=int),
+    'SPOOL_BACKUPS': config('MODEL_OUTPUT_SPOOL_BACKUPS', default=3, cast=int),
+}
+
+# Application logs are written as JSON lines by a background thread, so logging
+# never blocks a request on stdout or disk.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'correlation': {'()': 'core.log.CorrelationFilter'},
+    },
+    'handlers': {
+        'console': {
+            'class': 'core.log.NonBlockingStreamHandler',
+            'filters': ['correlation'],
+        },
+    },
+    'loggers': {
+        'core': {
+            'handlers': ['console'],
+            'level': MODEL_LOGGING['LEVEL'],
+            'propagate': False,
+        },
+        'core.model_output': {
+            'handlers': [],
+            'level': 'DEBUG',
+            'propagate': False,
+        },
+    },
+}
+if MODEL_LOGGING['SPOOL_ENABLED']:
+    LOGGING['handlers']['model_output_spool'] = {
+        'class': 'core.log.NonBlockingRotatingFileHandler',
+        'filters': ['correlation'],
+        'filename': MODEL_LOGGING['SPOOL_PATH'],
+        'maxBytes': MODEL_LOGGING['SPOOL_MAX_BYTES'],
+        'backupCount': MODEL_LOGGING['SPOOL_BACKUPS'],
+    }
+    LOGGING['loggers']['core.model_output']['handlers'] = ['model_output_spool']
+
+# OpenAPI schema: files generated at build time by `manage.py generate_swagger`
+# are served from OPENAPI_SCHEMA_DIR; the live views cache for this many seconds.
+OPENAPI_SCHEMA_DIR = Path(config('OPENAPI_SCHEMA_DIR', default=str(BASE_DIR)))
+OPENAPI_SCHEMA_CACHE_TIMEOUT = config('OPENAPI_SCHEMA_CACHE_TIMEOUT', default=0 if DEBUG else 3600, cast=int)
+
+SWAGGER_SETTINGS = {
+    'DEFAULT_INFO': 'backend.schema.api_info',
+    'SPEC_URL': '/swagger.json',
+}
+REDOC_SETTINGS = {
+    'SPEC_URL': '/swagger.json',
+}
@@ -1,30 +1,73 @@
 # admin.py
 from django.contrib import admin
-from .models import Project, ProjectResponse, AssignmentOfTask
+from .models import (
+    Project, ProjectResponse, AssignmentOfTask, ModelRoutingDecision, PrescreenDecision,
+    ProjectEvaluation, CompressionDictionary,
+    PROJECT_SEARCH_VECTOR,
+)
+from .admin_utils import ScalableAdminMixin, InputFilter
+from .prescreen import prescreen_stats
+
+
+class ProjectIdFilter(InputFilter):
+    title = "project ID"
+    parameter_name = "project_id"
+    lookup = "project_id"
+
+
+class CountryFilter(InputFilter):
+    title = "country"
+    parameter_name = "country"
+    lookup = "country__iexact"
+
+
+class FeasibilityScoreFilter(admin.SimpleListFilter):
+    """
+    Fixed 1-10 choices, so the filter doesn't scan the table for distinct scores.
+    """
+    title = "feasibility score"
+    parameter_name = "feasibility_score"
+
+    def lookups(self, request, model_admin):
+        return [(str(score), str(score)) for score in range(1, 11)]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(feasibility_score=self.value())
+        return queryset
 
 
 @admin.register(Project)
-class ProjectAdmin(admin.ModelAdmin):
+class ProjectAdmin(ScalableAdminMixin, admin.ModelAdmin):
     """
     Admin interface for the Project model.
     """
     list_display = ("title", "user", "start_date", "end_date", "budget", "created_at")
+    list_select_related = ("user",)
     search_fields = ("title", "description", "user__username", "country")
-    list_filter = ("start_date", "end_date", "country")
+    search_vector = PROJECT_SEARCH_VECTOR
+    search_lookups = ("user__username__iexact", "country__iexact")
+    list_filter = ("start_date", "end_date", CountryFilter)
+    autocomplete_fields = ("user",)
 
 
 @admin.register(ProjectResponse)
-class ProjectResponseAdmin(admin.ModelAdmin):
+class ProjectResponseAdmin(ScalableAdminMixin, admin.ModelAdmin):
     """
     Admin interface for the ProjectResponse model.
     """
-    list_display = ("project", "feasibility_score", "created_at")
-    search_fields = ("project__title", "analysis", "plan")
-    list_filter = ("feasibility_score", "created_at")
+    list_display = ("project", "feasibility_score", "provisional", "created_at")
+    list_select_related = ("project",)
+    search_fields = ("project__title",)
+    search_vector = PROJECT_SEARCH_VECTOR
+    search_vector_path = "project"
+    search_document = "search_document"  # The analysis and plan, which are stored compressed
+    list_filter = (FeasibilityScoreFilter, "provisional", "created_at")
+    autocomplete_fields = ("project",)
 
 
 @admin.register(AssignmentOfTask)
-class AssignmentOfTaskAdmin(admin.ModelAdmin):
+class AssignmentOfTaskAdmin(ScalableAdminMixin, admin.ModelAdmin):
     list_display = (
         'project',
         'team_member_number',
@@ -33,5 +76,76 @@ class AssignmentOfTaskAdmin(admin.ModelAdmin):
         'end_date_time',
         'created_at'
     )
-    search_fields = ('project__title', 'task', 'description')
-    list_filter = ('project', 'start_date_time')
+    list_select_related = ('project',)
+    search_fields = ('task',)
+    search_document = 'search_document'  # The task and its description, which is stored compressed
+    list_filter = (ProjectIdFilter, 'start_date_time')
+    autocomplete_fields = ('project',)
+
+
+@admin.register(ModelRoutingDecision)
+class ModelRoutingDecisionAdmin(admin.ModelAdmin):
+    """
+    Admin interface for the ModelRoutingDecision model.
+    """
+    list_display = ("prompt_name", "model", "reason", "prompt_chars", "latency_ms", "schema_valid", "reasked", "created_at")
+    list_filter = ("prompt_name", "model", "schema_valid", "reasked")
+
+
+@admin.register(PrescreenDecision)
+class PrescreenDecisionAdmin(admin.ModelAdmin):
+    """
+    Admin interface for the PrescreenDecision model. The title shows how many
+    model calls the pre-screen has saved.
+    """
+    list_display = ("project", "outcome", "reason", "probability", "created_at")
+    list_select_related = ("project",)
+    list_filter = ("outcome", "created_at")
+    raw_id_fields = ("project",)
+
+    def changelist_view(self, request, extra_context=None):
+        stats = prescreen_stats()
+        extra_context = {
+            "title": f"Pre-screen decisions: {stats['calls_saved']} of {stats['screened']} model calls saved",
+            **(extra_context or {}),
+        }
+        return super().changelist_view(request, extra_context)
+
+
+@admin.register(ProjectEvaluation)
+class ProjectEvaluationAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    """
+    Admin interface for the ProjectEvaluation model. Earlier versions are a
+    record of what was shown, so they can't be changed or deleted.
+    """
+    list_display = ("project", "version", "feasibility_score", "provisional", "evaluated_at", "superseded_at")
+    list_select_related = ("project",)
+    search_fields = ("project__title",)
+    search_vector = PROJECT_SEARCH_VECTOR
+    search_vector_path = "project"
+    list_filter = (ProjectIdFilter, FeasibilityScoreFilter, "provisional")
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(CompressionDictionary)
+class CompressionDictionaryAdmin(admin.ModelAdmin):
+    """
+    Admin interface for the CompressionDictionary model. Stored text refers
+    to the dictionaries, so they can't be changed or deleted.
+    """
+    list_display = ("id", "sample_count", "created_at")
+    exclude = ("data",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,196 @@
+import json
+
+from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList, ORDER_VAR
+from django.contrib.postgres.search import SearchQuery
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+# Query string parameter holding the keyset cursor (the last primary key seen)
+KEYSET_VAR = "before"
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that takes the row count from PostgreSQL's planner statistics
+    instead of running COUNT(*) over large tables. Small results (below
+    exact_count_threshold) and other databases still get an exact count.
+    """
+
+    exact_count_threshold = 10000
+    is_estimated = False
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == "postgresql":
+            estimate = self._estimate(queryset, connection)
+            if estimate is not None and estimate >= self.exact_count_threshold:
+                self.is_estimated = True
+                return estimate
+        self.is_estimated = False
+        return super().count
+
+    @staticmethod
+    def _estimate(queryset, connection):
+        with connection.cursor() as cursor:
+            if not queryset.query.where:
+                # Unfiltered: the table's row estimate from the last ANALYZE.
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [queryset.model._meta.db_table],
+                )
+            else:
+                sql, params = queryset.query.sql_with_params()
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            row = cursor.fetchone()
+
+        if row is None:
+            return None
+        if isinstance(row[0], (int, float)):
+            estimate = int(row[0])
+        else:
+            plan = row[0] if isinstance(row[0], list) else json.loads(row[0])
+            estimate = int(plan[0]["Plan"]["Plan Rows"])
+        # reltuples is -1 for tables that have never been analyzed.
+        return estimate if estimate >= 0 else None
+
+
+class KeysetChangeList(ChangeList):
+    """
+    ChangeList that pages with a primary-key cursor ("?before=<pk>") instead
+    of OFFSET, so later pages cost the same as the first one. Keyset paging
+    is used with the default newest-first ordering; when a column is sorted
+    the regular page-number paging is used.
+    """
+
+    def __init__(self, request, *args, **kwargs):
+        cursor = request.GET.get(KEYSET_VAR, "")
+        self.keyset_cursor = int(cursor) if cursor.isdigit() else None
+        self.keyset_enabled = ORDER_VAR not in request.GET
+        super().__init__(request, *args, **kwargs)
+        # The cursor belongs to the current sort, filters and search, so the
+        # links and forms built from params start over; only next_page_url
+        # adds it back.
+        self.params.pop(KEYSET_VAR, None)
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(KEYSET_VAR, None)
+        return lookup_params
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if self.keyset_enabled:
+            queryset = queryset.order_by("-pk")
+            if self.keyset_cursor is not None:
+                queryset = queryset.filter(pk__lt=self.keyset_cursor)
+        return queryset
+
+    def get_results(self, request):
+        if self.keyset_enabled:
+            # The cursor replaces page numbers: always read the first page after it.
+            self.page_num = 1
+        super().get_results(request)
+
+    @property
+    def next_cursor(self):
+        if not self.keyset_enabled:
+            return None
+        # len() fills the queryset's cache, which the results table then reuses.
+        results = self.result_list
+        if len(results) < self.list_per_page:
+            return None
+        return results[len(results) - 1].pk
+
+    def next_page_url(self):
+        return self.get_query_string({KEYSET_VAR: self.next_cursor})
+
+    def first_page_url(self):
+        return self.get_query_string()
+
+
+class ScalableAdminMixin:
+    """
+    ModelAdmin mixin for large tables: estimated counts, keyset paging, no
+    second unfiltered COUNT(*), and full-text search backed by a GIN index.
+
+    Set search_vector to the same SearchVector expression the model indexes
+    (see core.models) to search with it; search_vector_path searches through
+    a relation instead (e.g. "project" to match the related project).
+    search_lookups are also matched against the whole search term (e.g.
+    "country__iexact"), for fields the search vector doesn't cover.
+    search_document names a SearchVectorField on the model that is matched
+    as well, for text the database can't index itself (e.g. compressed text).
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    search_vector = None
+    search_vector_path = None
+    search_document = None
+    search_lookups = ()
+    search_config = "english"
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        searchable = self.search_vector is not None or self.search_document is not None
+        if not search_term or not searchable or connections[queryset.db].vendor != "postgresql":
+            return super().get_search_results(request, queryset, search_term)
+
+        query = SearchQuery(search_term, config=self.search_config, search_type="websearch")
+        condition = Q()
+        for lookup in self.search_lookups:
+            condition |= Q(**{lookup: search_term})
+        if self.search_document:
+            condition |= Q(**{self.search_document: query})
+        if self.search_vector is None:
+            return queryset.filter(condition), False
+        if self.search_vector_path:
+            related_model = self.model._meta.get_field(self.search_vector_path).related_model
+            matches = related_model._default_manager.annotate(search=self.search_vector).filter(search=query)
+            return queryset.filter(condition | Q(**{f"{self.search_vector_path}__in": matches.values("pk")})), False
+        return queryset.annotate(search=self.search_vector).filter(condition | Q(search=query)), False
+
+
+class InputFilter(admin.SimpleListFilter):
+    """
+    List filter rendered as a text box instead of one link per value, for
+    fields with too many distinct values to list (e.g. the related project).
+    Subclasses set title, parameter_name and lookup.
+    """
+
+    template = "admin/core/input_filter.html"
+    lookup = None
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        value = (self.value() or "").strip()
+        if not value:
+            return queryset
+        try:
+            return queryset.filter(**{self.lookup: value})
+        except (ValueError, ValidationError):
+            return queryset.none()
+
+    def choices(self, changelist):
+        # Hidden inputs keep the other active filters when the form is submitted.
+        yield {
+            "selected": self.value() is None,
+            "query_string": changelist.get_query_string(remove=[self.parameter_name]),
+            "display": "All",
+            "other_params": [
+                (key, value) for key, value in changelist.params.items() if key != self.parameter_name
+            ],
+        }
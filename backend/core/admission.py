@@ -0,0 +1,155 @@
+import math
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.timezone import now
+from rest_framework.exceptions import Throttled
+
+from .models import RateLimitBucket, InFlightGeneration
+
+GLOBAL_BUCKET = "global"
+
+
+def _refill(bucket, capacity, per_minute, current_time):
+    """
+    Adds the tokens earned since the bucket was last updated, up to capacity.
+    """
+    elapsed = (current_time - bucket.updated_at).total_seconds()
+    bucket.tokens = min(float(capacity), bucket.tokens + max(elapsed, 0) * per_minute / 60)
+    bucket.updated_at = current_time
+
+
+def _seconds_until_token(bucket, per_minute):
+    """
+    Returns how long until the bucket holds a full token again.
+    """
+    if per_minute <= 0:
+        return None
+    return math.ceil((1 - bucket.tokens) * 60 / per_minute)
+
+
+def admit_generation(user):
+    """
+    Admits one model generation for the given user, or raises Throttled (HTTP
+    429 with Retry-After) if the user's bucket or the global bucket is empty
+    or too many generations are already running.
+
+    Both buckets and the in-flight count are checked inside one transaction
+    with the bucket rows locked, so the limits hold across all worker
+    processes. Tokens are only spent when every check passes.
+
+    Returns:
+        int: ID of the InFlightGeneration row, to pass to release_generation().
+    """
+    limits = settings.MODEL_ADMISSION
+    user_key = f"user:{user.pk}"
+    current_time = now()
+
+    with transaction.atomic():
+        RateLimitBucket.objects.bulk_create(
+            [
+                RateLimitBucket(key=user_key, tokens=limits['USER_BURST'], updated_at=current_time),
+                RateLimitBucket(key=GLOBAL_BUCKET, tokens=limits['GLOBAL_BURST'], updated_at=current_time),
+            ],
+            ignore_conflicts=True,
+        )
+        # Lock in key order so concurrent requests can't deadlock.
+        buckets = {
+            bucket.key: bucket
+            for bucket in RateLimitBucket.objects.select_for_update()
+            .filter(key__in=[user_key, GLOBAL_BUCKET])
+            .order_by('key')
+        }
+        user_bucket, global_bucket = buckets[user_key], buckets[GLOBAL_BUCKET]
+
+        _refill(user_bucket, limits['USER_BURST'], limits['USER_PER_MINUTE'], current_time)
+        _refill(global_bucket, limits['GLOBAL_BURST'], limits['GLOBAL_PER_MINUTE'], current_time)
+
+        if user_bucket.tokens < 1:
+            raise Throttled(
+                wait=_seconds_until_token(user_bucket, limits['USER_PER_MINUTE']),
+                detail="Too many generation requests. Please wait before trying again."
+            )
+        if global_bucket.tokens < 1:
+            raise Throttled(
+                wait=_seconds_until_token(global_bucket, limits['GLOBAL_PER_MINUTE']),
+                detail="The service is busy. Please try again shortly."
+            )
+
+        # The global bucket row is locked, so this count can't race with other admissions.
+        stale_before = current_time - timedelta(seconds=limits['IN_FLIGHT_TIMEOUT'])
+        InFlightGeneration.objects.filter(started_at__lt=stale_before).delete()
+        if InFlightGeneration.objects.count() >= limits['MAX_IN_FLIGHT']:
+            raise Throttled(
+                wait=limits['IN_FLIGHT_RETRY_AFTER'],
+                detail="Too many generations are running. Please try again shortly."
+            )
+
+        user_bucket.tokens -= 1
+        global_bucket.tokens -= 1
+        RateLimitBucket.objects.bulk_update([user_bucket, global_bucket], ['tokens', 'updated_at'])
+        return InFlightGeneration.objects.create(user=user, started_at=current_time).pk
+
+
+def release_generation(generation_id, refund=False):
+    """
+    Marks a generation admitted by admit_generation() as finished. With
+    refund=True the tokens it spent are returned to the user's and the
+    global bucket, for admissions that ended up not calling the model.
+    """
+    limits = settings.MODEL_ADMISSION
+    with transaction.atomic():
+        generation = InFlightGeneration.objects.filter(pk=generation_id).first()
+        if generation is None:
+            return
+        generation.delete()
+        if not refund:
+            return
+
+        capacities = {f"user:{generation.user_id}": limits['USER_BURST'], GLOBAL_BUCKET: limits['GLOBAL_BURST']}
+        buckets = list(
+            RateLimitBucket.objects.select_for_update().filter(key__in=capacities).order_by('key')
+        )
+        for bucket in buckets:
+            bucket.tokens = min(float(capacities[bucket.key]), bucket.tokens + 1)
+        RateLimitBucket.objects.bulk_update(buckets, ['tokens'])
+
+
+class ModelAdmissionMixin:
+    """
+    Mixin for DRF views that call the model. The handler calls
+    admit_model_call() right before the model call, after validation and any
+    early returns, so rejected requests don't spend tokens; if it turns out
+    no model call was needed it calls refund_model_call(). The in-flight slot
+    is released once the response is finalized, including when the handler
+    raised.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._generation_id = None
+
+    def admit_model_call(self):
+        """
+        Admits the model call for the current request, raising Throttled when
+        over a limit.
+        """
+        if getattr(self, '_generation_id', None) is None:
+            self._generation_id = admit_generation(self.request.user)
+
+    def refund_model_call(self):
+        """
+        Gives back the tokens of an admitted call that didn't reach the model.
+        """
+        generation_id = getattr(self, '_generation_id', None)
+        if generation_id is not None:
+            release_generation(generation_id, refund=True)
+            self._generation_id = None
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        generation_id = getattr(self, '_generation_id', None)
+        if generation_id is not None:
+            release_generation(generation_id)
+            self._generation_id = None
+        return super().finalize_response(request, response, *args, **kwargs)
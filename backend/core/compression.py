@@ -0,0 +1,211 @@
+import threading
+import time
+import zlib
+from collections import Counter
+
+from django import forms
+from django.apps import apps
+from django.conf import settings
+from django.db import models
+from django.db.models.query_utils import DeferredAttribute
+
+# Stored values start with MARKER followed by a codec byte. Values written
+# before the columns were compressed are plain UTF-8 and can never start with
+# MARKER, since PostgreSQL text cannot contain NUL bytes.
+MARKER = b"\x00"
+CODEC_PLAIN = b"\x00"  # Followed by the UTF-8 text (values too short to compress)
+CODEC_DEFLATE = b"\x01"  # Followed by a 2-byte dictionary id (0 = none) and raw deflate data
+
+# zlib's window is 32 KB, so a longer preset dictionary is never used.
+MAX_DICTIONARY_SIZE = 32 * 1024
+
+_lock = threading.Lock()
+_dictionaries = {}  # dictionary id -> bytes; dictionaries are never changed once stored
+_active = {"id": 0, "checked_at": None}
+
+
+def _dictionary(dictionary_id):
+    with _lock:
+        if dictionary_id in _dictionaries:
+            return _dictionaries[dictionary_id]
+    data = bytes(apps.get_model("core", "CompressionDictionary").objects.values_list("data", flat=True).get(pk=dictionary_id))
+    with _lock:
+        _dictionaries[dictionary_id] = data
+    return data
+
+
+def active_dictionary_id(refresh=False):
+    """
+    Id of the newest trained dictionary (0 if there is none), re-read at most
+    every COMPRESSION['DICTIONARY_REFRESH_SECONDS'] (or now, with refresh) so
+    every worker picks up a newly trained dictionary without a restart.
+    """
+    now = time.monotonic()
+    checked_at = _active["checked_at"]
+    if refresh or checked_at is None or now - checked_at >= settings.COMPRESSION['DICTIONARY_REFRESH_SECONDS']:
+        latest = apps.get_model("core", "CompressionDictionary").objects.order_by("-id").values_list("id", flat=True).first()
+        _active.update(id=latest or 0, checked_at=now)
+    return _active["id"]
+
+
+def compress_text(text, dictionary_id=None):
+    """
+    Encodes text for a CompressedTextField, using the newest trained
+    dictionary unless dictionary_id is given.
+    """
+    data = text.encode("utf-8")
+    if len(data) < settings.COMPRESSION['MIN_LENGTH']:
+        return MARKER + CODEC_PLAIN + data
+
+    if dictionary_id is None:
+        dictionary_id = active_dictionary_id()
+    if dictionary_id:
+        compressor = zlib.compressobj(settings.COMPRESSION['LEVEL'], zlib.DEFLATED, -15, zdict=_dictionary(dictionary_id))
+    else:
+        compressor = zlib.compressobj(settings.COMPRESSION['LEVEL'], zlib.DEFLATED, -15)
+    compressed = MARKER + CODEC_DEFLATE + dictionary_id.to_bytes(2, "big") + compressor.compress(data) + compressor.flush()
+    if len(compressed) >= len(data) + 2:
+        return MARKER + CODEC_PLAIN + data
+    return compressed
+
+
+def decompress_text(data):
+    data = bytes(data)
+    if not data.startswith(MARKER):
+        return data.decode("utf-8")
+    codec = data[1:2]
+    if codec == CODEC_PLAIN:
+        return data[2:].decode("utf-8")
+    if codec == CODEC_DEFLATE:
+        dictionary_id = int.from_bytes(data[2:4], "big")
+        if dictionary_id:
+            decompressor = zlib.decompressobj(-15, zdict=_dictionary(dictionary_id))
+        else:
+            decompressor = zlib.decompressobj(-15)
+        return (decompressor.decompress(data[4:]) + decompressor.flush()).decode("utf-8")
+    raise ValueError(f"unknown compression codec {codec!r}")
+
+
+def train_dictionary(samples, size=16 * 1024):
+    """
+    Builds a zlib preset dictionary from sample texts: the word sequences that
+    save the most bytes across the samples (occurrences x length), with the
+    most valuable ones last, where zlib finds them at the shortest distance.
+    """
+    size = min(size, MAX_DICTIONARY_SIZE)
+    scores = Counter()
+    for text in samples:
+        words = text.split(" ")
+        seen = set()
+        for n in (1, 2, 4, 8):
+            for start in range(0, len(words) - n + 1):
+                phrase = " ".join(words[start:start + n]) + " "
+                if len(phrase) >= 4:
+                    seen.add(phrase)
+        # Count each phrase once per sample so one long text can't dominate.
+        for phrase in seen:
+            scores[phrase] += len(phrase)
+
+    chosen, used = [], 0
+    for phrase, score in scores.most_common():
+        if score <= len(phrase):
+            break  # Seen in only one sample
+        if any(phrase in longer for longer in chosen[-200:]):
+            continue
+        encoded = phrase.encode("utf-8")
+        if used + len(encoded) > size:
+            continue
+        chosen.append(phrase)
+        used += len(encoded)
+    return "".join(reversed(chosen)).encode("utf-8")
+
+
+class CompressedValue(bytes):
+    """
+    A stored value read from the database and not decompressed yet.
+    """
+
+
+class CompressedTextDescriptor(DeferredAttribute):
+    """
+    Decompresses a CompressedTextField the first time it is read on an
+    instance and caches the text.
+    """
+
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+        value = super().__get__(instance, cls)
+        if isinstance(value, CompressedValue):
+            value = decompress_text(value)
+            instance.__dict__[self.field.attname] = value
+        return value
+
+    def __set__(self, instance, value):
+        # Defining __set__ makes this a data descriptor, so __get__ runs even
+        # though the value lives in the instance __dict__.
+        instance.__dict__[self.field.attname] = value
+
+
+def stored_value(instance, field_name):
+    """
+    The field's value without decompressing it, for copying a stored value to
+    another row without compressing it again.
+    """
+    value = instance.__dict__.get(field_name)
+    return value if isinstance(value, CompressedValue) else getattr(instance, field_name)
+
+
+class CompressedTextField(models.BinaryField):
+    """
+    Text field stored compressed (zlib with a trained preset dictionary, see
+    train_dictionary). Instances hold the compressed bytes until the
+    attribute is read, so loading rows whose text isn't used costs no
+    decompression; use .defer() to skip loading it at all.
+
+    values() and values_list() return the stored bytes (a CompressedValue),
+    not the text; pass them to decompress_text(). Assigning bytes stores them
+    as they are, so they must be a stored value or plain UTF-8.
+    """
+
+    descriptor_class = CompressedTextDescriptor
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("editable", True)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if kwargs.get("editable") is True:
+            del kwargs["editable"]
+        return name, path, args, kwargs
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return None
+        return CompressedValue(value)
+
+    def to_python(self, value):
+        if isinstance(value, (bytes, memoryview)):
+            return decompress_text(value)
+        return value
+
+    def get_default(self):
+        # BinaryField defaults to b""; the attribute holds text, so use "".
+        default = super().get_default()
+        return "" if default == b"" else default
+
+    def get_prep_value(self, value):
+        if value is None:
+            return None
+        if isinstance(value, (bytes, memoryview)):
+            # Already a stored value (or plain UTF-8, which decompress_text
+            # reads as it is), e.g. a CompressedValue copied from another row.
+            return bytes(value)
+        return compress_text(str(value))
+
+    def value_to_string(self, obj):
+        return self.value_from_object(obj)
+
+    def formfield(self, **kwargs):
+        return models.Field.formfield(self, **{"form_class": forms.CharField, "widget": forms.Textarea, **kwargs})
@@ -0,0 +1,191 @@
+import copy
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import uuid
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import orjson
+from django.conf import settings
+
+# Correlation ids (request_id, project_id, job_id, ...) attached to every log
+# record emitted in the current context
+_log_context = ContextVar("log_context", default={})
+
+# Attributes every LogRecord has; anything else on a record came from `extra`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+spool_logger = logging.getLogger("core.model_output")
+
+# Non-blocking handlers whose listener thread is running
+_active_handlers = weakref.WeakSet()
+
+
+@contextmanager
+def log_context(**values):
+    """
+    Adds correlation ids to every log line written inside the block, e.g.
+    `with log_context(project_id=project.id): ...`.
+    """
+    token = _log_context.set({**_log_context.get(), **values})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+class CorrelationFilter(logging.Filter):
+    """
+    Copies the current correlation ids onto each record. Runs in the thread
+    that logs, since the ids live in context variables.
+    """
+
+    def filter(self, record):
+        for key, value in _log_context.get().items():
+            setattr(record, key, value)
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Formats records as one JSON object per line, including correlation ids
+    and any `extra` fields.
+    """
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return orjson.dumps(entry, default=str).decode()
+
+
+class _NonBlockingHandler(logging.handlers.QueueHandler):
+    """
+    Puts records on an in-memory queue; a background listener thread formats
+    and writes them, so logging never waits on stdout or disk. When the queue
+    is full, records are dropped instead of blocking the request.
+    """
+
+    def __init__(self, target, queue_size=10000):
+        super().__init__(queue.Queue(queue_size))
+        target.setFormatter(JSONFormatter())
+        self.listener = logging.handlers.QueueListener(self.queue, target, respect_handler_level=True)
+        self.listener.start()
+        _active_handlers.add(self)
+
+    def stop(self):
+        _active_handlers.discard(self)
+        # QueueListener.stop() fails when called twice before Python 3.12.
+        if self.listener._thread is not None:
+            self.listener.stop()
+
+    def close(self):
+        # Called by logging.shutdown() at exit and when dictConfig replaces
+        # the handler; writes out the queued records first.
+        self.stop()
+        super().close()
+
+    def _restart_after_fork(self):
+        # Only the forking thread survives in a child process (e.g. rescore
+        # --pool process), so it needs its own listener, and a new queue in
+        # case the lost thread held the old one's lock.
+        self.queue = queue.Queue(self.queue.maxsize)
+        self.listener = logging.handlers.QueueListener(self.queue, *self.listener.handlers, respect_handler_level=True)
+        self.listener.start()
+
+    def prepare(self, record):
+        # Only resolve the message here; the JSON formatting happens on the listener thread.
+        # Other handlers of the same logger still get the caller's record unchanged.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+
+def _restart_listeners_after_fork():
+    for handler in list(_active_handlers):
+        handler._restart_after_fork()
+
+
+# Registered once for the module, rather than per handler, so re-running the
+# logging configuration doesn't pile up callbacks for replaced handlers.
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_listeners_after_fork)
+
+
+class NonBlockingStreamHandler(_NonBlockingHandler):
+    def __init__(self, stream=None, queue_size=10000):
+        super().__init__(logging.StreamHandler(stream), queue_size)
+
+
+class NonBlockingRotatingFileHandler(_NonBlockingHandler):
+    def __init__(self, filename, maxBytes=0, backupCount=0, queue_size=10000):
+        os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+        super().__init__(
+            logging.handlers.RotatingFileHandler(filename, maxBytes=maxBytes, backupCount=backupCount, delay=True),
+            queue_size,
+        )
+
+
+def truncate(text, limit):
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}... [{len(text) - limit} more chars]"
+
+
+def log_model_output(logger, model, raw, stage="response", failed=False):
+    """
+    Logs a model output without flooding the logs: the size is always
+    recorded, a truncated preview only for a sample of calls (always on
+    failures). The full text goes to the rotating on-disk spool, and only
+    when MODEL_LOGGING['SPOOL_ENABLED'] is set.
+    """
+    config = settings.MODEL_LOGGING
+    extra = {"model": model, "stage": stage, "output_chars": len(raw)}
+    if failed or random.random() < config['OUTPUT_SAMPLE_RATE']:
+        extra["output_preview"] = truncate(raw, config['OUTPUT_MAX_CHARS'])
+    logger.log(logging.WARNING if failed else logging.INFO, "Model output received", extra=extra)
+
+    if config['SPOOL_ENABLED']:
+        spool_logger.debug(raw, extra={"model": model, "stage": stage})
+
+
+class RequestIdMiddleware:
+    """
+    Gives each request a correlation id (taken from X-Request-ID when the
+    client or proxy sends one) that is added to every log line written while
+    handling it and returned in the X-Request-ID response header.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_id = request.META.get("HTTP_X_REQUEST_ID", "")[:64] or uuid.uuid4().hex
+        with log_context(request_id=request_id):
+            response = self.get_response(request)
+        response["X-Request-ID"] = request_id
+        return response
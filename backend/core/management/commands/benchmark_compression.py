@@ -0,0 +1,122 @@
+import random
+import time
+import zlib
+
+from django.core.management.base import BaseCommand
+
+from core.compression import decompress_text, train_dictionary
+from core.management.commands.train_compression_dictionary import sample_texts
+from core.models import ProjectResponse
+
+# Sentence fragments for synthetic evaluations when the database has too few.
+_FRAGMENTS = [
+    "The project is feasible given the team size and the proposed timeline.",
+    "Key risks include budget overruns, delayed procurement and limited local expertise.",
+    "Phase {n}: requirements gathering and stakeholder interviews over {n} weeks.",
+    "The team should allocate {n} members to development and one to quality assurance.",
+    "A detailed budget breakdown shows that {n}% of funds go to personnel costs.",
+    "Regulatory approval in the target country may take up to {n} months.",
+    "Milestones are reviewed at the end of every sprint with the project sponsor.",
+    "To improve feasibility, reduce the initial scope and extend the timeline by {n} weeks.",
+    "Deliverables include a working prototype, documentation and a deployment plan.",
+    "Market research indicates moderate demand, with competitors already established.",
+]
+
+
+def _synthetic_texts(count, seed=7):
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choice(_FRAGMENTS).format(n=rng.randint(2, 40)) for _ in range(rng.randint(8, 60)))
+        for _ in range(count)
+    ]
+
+
+def _deflate(text, zdict=None):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, -15, zdict=zdict) if zdict else zlib.compressobj(6, zlib.DEFLATED, -15)
+    return compressor.compress(text.encode("utf-8")) + compressor.flush()
+
+
+def _inflate(data, zdict=None):
+    decompressor = zlib.decompressobj(-15, zdict=zdict) if zdict else zlib.decompressobj(-15)
+    return decompressor.decompress(data) + decompressor.flush()
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures the compressed text fields: storage size raw, with zlib and "
+        "with zlib plus a trained dictionary (trained on one half of the texts, "
+        "measured on the other), codec latency, and the time to load evaluations "
+        "from the database with the text deferred, loaded or decompressed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--samples", type=int, default=2000, help="Texts to measure (default: 2000).")
+        parser.add_argument("--rows", type=int, default=500, help="Evaluations loaded in the read test (default: 500).")
+        parser.add_argument("--repeat", type=int, default=5, help="Best of this many read runs (default: 5).")
+
+    def handle(self, *args, **options):
+        texts = list(sample_texts(options["samples"]))
+        source = "stored"
+        if len(texts) < 20:
+            texts, source = _synthetic_texts(options["samples"]), "synthetic"
+        random.Random(1).shuffle(texts)
+        training, measured = texts[::2], texts[1::2]
+        zdict = train_dictionary(training)
+
+        raw = sum(len(text.encode("utf-8")) for text in measured)
+        plain = [_deflate(text) for text in measured]
+        with_dict = [_deflate(text, zdict) for text in measured]
+        self.stdout.write(f"{len(measured)} {source} text(s), dictionary {len(zdict):,} bytes:")
+        self.stdout.write(f"  raw              {raw:>12,} bytes")
+        for name, blobs in (("zlib", plain), ("zlib+dictionary", with_dict)):
+            size = sum(len(blob) for blob in blobs)
+            self.stdout.write(f"  {name:<16} {size:>12,} bytes  ratio {raw / size:5.2f}x")
+
+        started = time.perf_counter()
+        for text in measured:
+            _deflate(text, zdict)
+        compress_time = time.perf_counter() - started
+        started = time.perf_counter()
+        for blob in with_dict:
+            _inflate(blob, zdict)
+        decompress_time = time.perf_counter() - started
+        self.stdout.write(
+            f"  per text: compress {compress_time / len(measured) * 1e6:.0f} us, "
+            f"decompress {decompress_time / len(measured) * 1e6:.0f} us"
+        )
+
+        self.benchmark_reads(options["rows"], options["repeat"])
+
+    def benchmark_reads(self, rows, repeat):
+        if not ProjectResponse.objects.exists():
+            self.stdout.write("No stored evaluations; skipping the read test.")
+            return
+
+        text_fields = ("detailed_description", "plan", "analysis")
+        cases = [
+            ("text deferred", lambda: ProjectResponse.objects.defer(*text_fields), False),
+            ("text loaded, not read", lambda: ProjectResponse.objects.all(), False),
+            ("text loaded and read", lambda: ProjectResponse.objects.all(), True),
+        ]
+        self.stdout.write(f"Loading up to {rows} evaluations:")
+        for name, queryset, read_text in cases:
+            best = None
+            for _ in range(repeat):
+                started = time.perf_counter()
+                for response in queryset().order_by("-pk")[:rows]:
+                    if read_text:
+                        for field in text_fields:
+                            getattr(response, field)
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            self.stdout.write(f"  {name:<22} {best * 1000:8.1f} ms")
+
+        # Stored values as a share of the raw text, across the whole table.
+        stored = raw = 0
+        for values in ProjectResponse.objects.values_list(*text_fields).iterator():
+            for value in values:
+                if value is not None:
+                    stored += len(value)
+                    raw += len(decompress_text(value).encode("utf-8"))
+        if raw:
+            self.stdout.write(f"Stored evaluation text: {stored:,} bytes for {raw:,} bytes of text ({raw / stored:.2f}x).")
@@ -0,0 +1,85 @@
+import json
+import time
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from core.models import Project, ProjectResponse, AssignmentOfTask
+from core.renderers import ORJSONRenderer
+from core.serializers import (
+    ProjectSerializer, ProjectReadSerializer,
+    ProjectResponseSerializer, ProjectResponseReadSerializer,
+    AssignmentOfTaskSerializer, AssignmentOfTaskReadSerializer,
+)
+
+
+def _build_objects(count):
+    """
+    Builds unsaved model instances that look like real rows, so the benchmark
+    needs no database.
+    """
+    user = User(id=1, username="benchmark")
+    created = datetime(2025, 1, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    projects, responses, tasks = [], [], []
+    for index in range(count):
+        project = Project(
+            id=index + 1, user=user, title=f"Project {index}", description="Build and launch a product. " * 10,
+            team_size=5, start_date=date(2025, 1, 1), end_date=date(2025, 6, 30), country="Kenya",
+            budget=Decimal("125000.00"), created_at=created,
+        )
+        projects.append(project)
+        responses.append(ProjectResponse(
+            id=index + 1, project=project, detailed_description="Detailed description. " * 40,
+            plan="Step. " * 80, analysis="Analysis. " * 80, feasibility_score=7, created_at=created,
+        ))
+        tasks.append(AssignmentOfTask(
+            id=index + 1, project=project, team_member_number=index % 5 + 1, task=f"Task {index}",
+            start_date_time=created + timedelta(days=index % 30), end_date_time=created + timedelta(days=index % 30 + 2),
+            description="Do the work. " * 15, created_at=created,
+        ))
+    return projects, responses, tasks
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares serialization + rendering throughput of the ModelSerializers "
+        "with DRF's JSONRenderer against the read serializers with the orjson "
+        "renderer, on large in-memory payloads."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=5000, help="Objects per payload (default: 5000).")
+        parser.add_argument("--repeat", type=int, default=3, help="Best of this many runs (default: 3).")
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        projects, responses, tasks = _build_objects(rows)
+        cases = [
+            ("project list", projects, ProjectSerializer, ProjectReadSerializer),
+            ("evaluations", responses, ProjectResponseSerializer, ProjectResponseReadSerializer),
+            ("tasks", tasks, AssignmentOfTaskSerializer, AssignmentOfTaskReadSerializer),
+        ]
+
+        for name, objects, before_serializer, after_serializer in cases:
+            before_output, before_time = self.measure(objects, before_serializer, JSONRenderer(), options["repeat"])
+            after_output, after_time = self.measure(objects, after_serializer, ORJSONRenderer(), options["repeat"])
+            if json.loads(before_output) != json.loads(after_output):
+                self.stderr.write(f"{name}: read serializer output differs from the ModelSerializer output")
+            self.stdout.write(
+                f"{name:<13} before {rows / before_time:>9,.0f} rows/s ({len(before_output) / before_time / 1e6:6.1f} MB/s)  "
+                f"after {rows / after_time:>9,.0f} rows/s ({len(after_output) / after_time / 1e6:6.1f} MB/s)  "
+                f"speed-up x{before_time / after_time:.1f}"
+            )
+
+    @staticmethod
+    def measure(objects, serializer_class, renderer, repeat):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            output = renderer.render(serializer_class(objects, many=True).data)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return output, best
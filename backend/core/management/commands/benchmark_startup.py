@@ -0,0 +1,95 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter: loads the WSGI application, then serves one
+# request through it, and reports how long each phase took.
+PROBE = r"""
+import json, sys, time
+started = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+loaded = time.perf_counter()
+
+status = []
+environ = {
+    "REQUEST_METHOD": "GET", "PATH_INFO": sys.argv[1], "QUERY_STRING": "",
+    "SERVER_NAME": "localhost", "SERVER_PORT": "8000", "SERVER_PROTOCOL": "HTTP/1.1",
+    "wsgi.url_scheme": "http", "wsgi.input": __import__("io").BytesIO(), "wsgi.errors": sys.stderr,
+    "wsgi.multithread": True, "wsgi.multiprocess": True, "wsgi.run_once": False,
+}
+body = b"".join(application(environ, lambda s, h, e=None: status.append(s)))
+finished = time.perf_counter()
+
+print(json.dumps({
+    "status": status[0],
+    "app_load_ms": (loaded - started) * 1000,
+    "first_request_ms": (finished - loaded) * 1000,
+    "modules_loaded": len(sys.modules),
+    "replicate_loaded": "replicate" in sys.modules,
+}))
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures cold start: the time to load the WSGI application and serve the "
+        "first request in a fresh Python process. Use --record to append results "
+        "to a JSON-lines file and track them over time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5, help="Number of fresh processes to start (default: 5).")
+        parser.add_argument("--path", default="/swagger.json", help="Request path for the first request (default: /swagger.json).")
+        parser.add_argument("--record", help="Append the summary as one JSON line to this file.")
+
+    def handle(self, *args, **options):
+        if options["runs"] < 1:
+            raise CommandError("--runs must be positive.")
+
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get("DJANGO_SETTINGS_MODULE", "backend.settings"))
+        samples = []
+        for run in range(options["runs"]):
+            started = time.perf_counter()
+            completed = subprocess.run(
+                [sys.executable, "-c", PROBE, options["path"]],
+                cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+            )
+            total_ms = (time.perf_counter() - started) * 1000
+            if completed.returncode != 0:
+                raise CommandError(f"Startup probe failed:\n{completed.stderr}")
+
+            sample = json.loads(completed.stdout.strip().splitlines()[-1])
+            sample["process_total_ms"] = total_ms
+            samples.append(sample)
+            self.stdout.write(
+                f"run {run + 1}: {sample['status']} app load {sample['app_load_ms']:.0f}ms, "
+                f"first request {sample['first_request_ms']:.0f}ms, process total {total_ms:.0f}ms"
+            )
+
+        summary = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "path": options["path"],
+            "runs": len(samples),
+            "fast_start": os.environ.get("FAST_START", "0") == "1",
+            "replicate_loaded": samples[-1]["replicate_loaded"],
+            "modules_loaded": samples[-1]["modules_loaded"],
+        }
+        for key in ("app_load_ms", "first_request_ms", "process_total_ms"):
+            summary[f"median_{key}"] = round(statistics.median(sample[key] for sample in samples), 1)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"median time to first request: {summary['median_process_total_ms']:.0f}ms "
+            f"(app load {summary['median_app_load_ms']:.0f}ms, first request {summary['median_first_request_ms']:.0f}ms, "
+            f"{summary['modules_loaded']} modules, replicate imported: {summary['replicate_loaded']})"
+        ))
+
+        if options["record"]:
+            with open(options["record"], "a") as f:
+                f.write(json.dumps(summary) + "\n")
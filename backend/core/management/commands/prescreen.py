@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.prescreen import FEATURES, FeasibilityModel, training_data, prescreen_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Manages the local pre-screen. 'train' fits the pre-screen model on the "
+        "stored evaluations (needs NumPy); 'stats' shows how many model calls "
+        "the pre-screen has saved."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("action", choices=("train", "stats"))
+        parser.add_argument("--epochs", type=int, default=2000, help="Gradient descent steps (default: 2000).")
+
+    def handle(self, *args, **options):
+        if options["action"] == "train":
+            self.train(options["epochs"])
+        stats = prescreen_stats()
+        share = stats["calls_saved"] / stats["screened"] if stats["screened"] else 0.0
+        self.stdout.write(
+            f"Pre-screened {stats['screened']} project(s): {stats['calls_saved']} model call(s) saved "
+            f"({share:.1%}), {stats['full_calls']} sent to the model."
+        )
+
+    def train(self, epochs):
+        config = settings.PRESCREEN
+        rows, labels = training_data()
+        if len(rows) < config['MIN_TRAINING_ROWS']:
+            raise CommandError(
+                f"Only {len(rows)} stored evaluation(s); at least {config['MIN_TRAINING_ROWS']} are needed to train."
+            )
+        if len(set(labels)) < 2:
+            raise CommandError("The stored evaluations are all feasible or all infeasible; nothing to learn.")
+
+        try:
+            model = FeasibilityModel.train(rows, labels, epochs=epochs)
+        except ImportError:
+            raise CommandError("Training the pre-screen model needs NumPy: pip install numpy") from None
+
+        # Share of the training rows the new threshold would short-circuit, and how many wrongly.
+        threshold = config['SHORT_CIRCUIT_BELOW']
+        flagged = [label for row, label in zip(rows, labels) if model.predict(row) <= threshold]
+        accuracy = sum((model.predict(row) >= 0.5) == bool(label) for row, label in zip(rows, labels)) / len(rows)
+
+        model.save(config['MODEL_PATH'])
+        self.stdout.write(f"Trained on {len(rows)} evaluation(s), {sum(labels)} feasible; accuracy {accuracy:.1%}.")
+        for name, weight in zip(FEATURES, model.weights):
+            self.stdout.write(f"  {name:<26} {weight:+.3f}")
+        self.stdout.write(
+            f"At SHORT_CIRCUIT_BELOW={threshold}, {len(flagged)} of the training projects would be short-circuited, "
+            f"{sum(flagged)} of them rated feasible by the model."
+        )
+        self.stdout.write(f"Saved to {config['MODEL_PATH']}.")
@@ -0,0 +1,207 @@
+import json
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.utils.dateparse import parse_date
+
+from core.log import log_context
+from core.models import Project, ProjectResponse, ProjectEvaluation, update_search_documents
+from core.utils import generate_project_analysis
+
+
+def _rescore_project(project_id, job_id):
+    """
+    Worker: runs the analysis prompt for one project and returns the new
+    ProjectResponse field values (or None if the model output was unusable).
+    Log lines written meanwhile carry the run's job id.
+    """
+    try:
+        with log_context(job_id=job_id, project_id=project_id):
+            project = Project.objects.get(pk=project_id)
+            return project_id, generate_project_analysis(project)
+    finally:
+        # Each worker thread/process holds its own connection; don't leak it.
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-evaluates existing projects with the current prompt and model. "
+        "Runs model calls concurrently, writes results in batches and keeps the "
+        "old evaluation as a ProjectEvaluation (and its score in "
+        "previous_feasibility_score). Progress is checkpointed so an "
+        "interrupted run can be resumed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ids", nargs="+", type=int, help="Only rescore these project IDs.")
+        parser.add_argument("--user", help="Only rescore projects owned by this username.")
+        parser.add_argument("--created-after", help="Only projects created on or after this date (YYYY-MM-DD).")
+        parser.add_argument("--created-before", help="Only projects created before this date (YYYY-MM-DD).")
+        parser.add_argument("--min-score", type=int, help="Only projects whose current score is at least this.")
+        parser.add_argument("--max-score", type=int, help="Only projects whose current score is at most this.")
+        parser.add_argument("--missing-only", action="store_true", help="Only projects without an evaluation.")
+        parser.add_argument(
+            "--provisional-only", action="store_true",
+            help="Only projects whose evaluation is provisional (from the pre-screen)."
+        )
+        parser.add_argument("--limit", type=int, help="Rescore at most this many projects.")
+        parser.add_argument("--workers", type=int, default=4, help="Maximum concurrent model calls (default: 4).")
+        parser.add_argument(
+            "--pool", choices=("thread", "process"), default="thread",
+            help="Run model calls in a thread pool (default) or a process pool."
+        )
+        parser.add_argument("--batch-size", type=int, default=25, help="Results written per transaction (default: 25).")
+        parser.add_argument(
+            "--checkpoint", default="rescore_checkpoint.json",
+            help="File recording finished project IDs (default: rescore_checkpoint.json)."
+        )
+        parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint and start over.")
+        parser.add_argument("--dry-run", action="store_true", help="Only report which projects would be rescored.")
+
+    def handle(self, *args, **options):
+        if options["workers"] < 1 or options["batch_size"] < 1:
+            raise CommandError("--workers and --batch-size must be positive.")
+
+        checkpoint_path = options["checkpoint"]
+        checkpoint = {"completed": [], "failed": []}
+        if os.path.exists(checkpoint_path) and not options["restart"]:
+            with open(checkpoint_path) as f:
+                checkpoint = json.load(f)
+            self.stdout.write(f"Resuming from {checkpoint_path}: {len(checkpoint['completed'])} project(s) already done.")
+
+        project_ids = list(
+            self.select_projects(options)
+            .exclude(id__in=checkpoint["completed"])
+            .values_list("id", flat=True)
+        )
+        if options["limit"]:
+            project_ids = project_ids[:options["limit"]]
+
+        total = len(project_ids)
+        self.stdout.write(f"{total} project(s) to rescore with {options['workers']} {options['pool']} worker(s).")
+        if options["dry_run"] or not total:
+            return
+
+        executor_class = ProcessPoolExecutor if options["pool"] == "process" else ThreadPoolExecutor
+        if executor_class is ProcessPoolExecutor:
+            # Forked workers must not share the parent's database connections.
+            connections.close_all()
+
+        job_id = uuid.uuid4().hex
+        self.stdout.write(f"Job ID {job_id} (tags this run's log lines).")
+
+        pending = {}
+        done = failed = 0
+        started = time.monotonic()
+        with executor_class(max_workers=options["workers"]) as executor:
+            futures = {executor.submit(_rescore_project, project_id, job_id): project_id for project_id in project_ids}
+            try:
+                for future in as_completed(futures):
+                    project_id = futures[future]
+                    try:
+                        _, fields = future.result()
+                    except Exception as e:
+                        self.stderr.write(f"Project {project_id} failed: {e}")
+                        fields = None
+
+                    if fields is None:
+                        failed += 1
+                        if project_id not in checkpoint["failed"]:
+                            checkpoint["failed"].append(project_id)
+                    else:
+                        pending[project_id] = fields
+
+                    if len(pending) >= options["batch_size"]:
+                        self.write_batch(pending, checkpoint, checkpoint_path)
+
+                    done += 1
+                    self.report_progress(done, total, started)
+            except KeyboardInterrupt:
+                for future in futures:
+                    future.cancel()
+                self.stderr.write("Interrupted, saving finished results.")
+                raise
+            finally:
+                self.write_batch(pending, checkpoint, checkpoint_path)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Rescored {done - failed} of {total} project(s) in {elapsed:.1f}s ({failed} failed)."
+        ))
+
+    def select_projects(self, options):
+        """
+        Builds the project queryset from the command line filters.
+        """
+        projects = Project.objects.order_by("id")
+        if options["ids"]:
+            projects = projects.filter(id__in=options["ids"])
+        if options["user"]:
+            projects = projects.filter(user__username=options["user"])
+        for option, lookup in (("created_after", "created_at__date__gte"), ("created_before", "created_at__date__lt")):
+            if options[option]:
+                value = parse_date(options[option])
+                if value is None:
+                    raise CommandError(f"--{option.replace('_', '-')} must be a date in YYYY-MM-DD format.")
+                projects = projects.filter(**{lookup: value})
+        if options["min_score"] is not None:
+            projects = projects.filter(response__feasibility_score__gte=options["min_score"])
+        if options["max_score"] is not None:
+            projects = projects.filter(response__feasibility_score__lte=options["max_score"])
+        if options["missing_only"]:
+            projects = projects.filter(response__isnull=True)
+        if options["provisional_only"]:
+            projects = projects.filter(response__provisional=True)
+        return projects
+
+    def write_batch(self, pending, checkpoint, checkpoint_path):
+        """
+        Saves a batch of results in one transaction, archiving each replaced
+        evaluation as a ProjectEvaluation, then records the batch in the checkpoint.
+        """
+        if pending:
+            with transaction.atomic():
+                existing = ProjectResponse.objects.select_for_update().filter(project_id__in=pending.keys())
+                to_update, archived = [], []
+                for project_response in existing:
+                    archived.append(project_response.supersede(pending.pop(project_response.project_id)))
+                    to_update.append(project_response)
+                    checkpoint["completed"].append(project_response.project_id)
+
+                ProjectEvaluation.objects.bulk_create(archived)
+                ProjectResponse.objects.bulk_update(
+                    to_update,
+                    [
+                        "detailed_description", "plan", "analysis", "feasibility_score", "previous_feasibility_score",
+                        "provisional", "version", "evaluated_at",
+                    ],
+                )
+                created = ProjectResponse.objects.bulk_create([
+                    ProjectResponse(project_id=project_id, **fields) for project_id, fields in pending.items()
+                ])
+                # bulk_update()/bulk_create() don't call save(), which fills the search documents.
+                update_search_documents(to_update + created)
+                checkpoint["completed"].extend(pending.keys())
+            pending.clear()
+
+        completed = set(checkpoint["completed"])
+        checkpoint["failed"] = [project_id for project_id in checkpoint["failed"] if project_id not in completed]
+
+        # Write the checkpoint atomically so a crash can't leave it half written.
+        tmp_path = f"{checkpoint_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, checkpoint_path)
+
+    def report_progress(self, done, total, started):
+        elapsed = time.monotonic() - started
+        rate = done / elapsed if elapsed else 0.0
+        eta = (total - done) / rate if rate else 0.0
+        self.stdout.write(
+            f"[{done}/{total}] {rate:.2f} projects/s, elapsed {elapsed:.0f}s, ETA {int(eta // 60)}m{int(eta % 60):02d}s"
+        )
@@ -0,0 +1,85 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.compression import active_dictionary_id, compress_text, train_dictionary
+from core.models import ProjectResponse, ProjectEvaluation, AssignmentOfTask, CompressionDictionary
+
+# Models and fields whose text is stored compressed
+COMPRESSED_FIELDS = [
+    (ProjectResponse, ("detailed_description", "plan", "analysis")),
+    (ProjectEvaluation, ("detailed_description", "plan", "analysis")),
+    (AssignmentOfTask, ("description",)),
+]
+
+
+def sample_texts(limit):
+    """
+    The newest stored texts of every compressed field, at most `limit` per model.
+    """
+    for model, fields in COMPRESSED_FIELDS:
+        for row in model.objects.order_by("-pk").only(*fields)[:limit]:
+            for name in fields:
+                text = getattr(row, name)
+                if text:
+                    yield text
+
+
+class Command(BaseCommand):
+    help = (
+        "Trains a new zlib preset dictionary on stored evaluations and task "
+        "descriptions. New values are compressed with it; --recompress also "
+        "rewrites the stored values with it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--samples", type=int, default=2000, help="Rows sampled per model (default: 2000).")
+        parser.add_argument(
+            "--size", type=int, default=settings.COMPRESSION['DICTIONARY_SIZE'],
+            help="Dictionary size in bytes, at most 32768 (default: COMPRESSION['DICTIONARY_SIZE'])."
+        )
+        parser.add_argument("--recompress", action="store_true", help="Recompress the stored values afterwards.")
+        parser.add_argument("--batch-size", type=int, default=500, help="Rows rewritten per transaction (default: 500).")
+
+    def handle(self, *args, **options):
+        samples = list(sample_texts(options["samples"]))
+        if len(samples) < 10:
+            raise CommandError(f"Only {len(samples)} stored text(s); not enough to train a dictionary.")
+
+        data = train_dictionary(samples, options["size"])
+        dictionary = CompressionDictionary.objects.create(data=data, sample_count=len(samples))
+        before = sum(len(compress_text(text, dictionary_id=0)) for text in samples)
+        after = sum(len(compress_text(text, dictionary_id=dictionary.pk)) for text in samples)
+        raw = sum(len(text.encode("utf-8")) for text in samples)
+        self.stdout.write(
+            f"Dictionary {dictionary.pk}: {len(data)} bytes from {len(samples)} text(s). "
+            f"Sample size {raw:,} bytes raw, {before:,} compressed without it, {after:,} with it."
+        )
+
+        if options["recompress"]:
+            active_dictionary_id(refresh=True)
+            for model, fields in COMPRESSED_FIELDS:
+                count = self.recompress(model, fields, options["batch_size"])
+                self.stdout.write(f"Recompressed {count} {model._meta.verbose_name_plural}.")
+
+    @staticmethod
+    def recompress(model, fields, batch_size):
+        """
+        Rewrites every row's compressed fields with the newest dictionary, in
+        primary-key order and one transaction per batch.
+        """
+        count, last_pk = 0, 0
+        while True:
+            with transaction.atomic():
+                rows = list(model.objects.filter(pk__gt=last_pk).order_by("pk").only(*fields)[:batch_size])
+                if not rows:
+                    return count
+                for row in rows:
+                    for name in fields:
+                        text = getattr(row, name)
+                        if text is not None:
+                            # Reading decompressed the value; saving the text compresses it again.
+                            setattr(row, name, text)
+                model.objects.bulk_update(rows, fields)
+            count += len(rows)
+            last_pk = rows[-1].pk
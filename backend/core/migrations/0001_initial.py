@@ -0,0 +1,58 @@
+# Generated by Django 4.2.19 on 2026-10-19 03:41
+
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Project',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(help_text='Title of the project.', max_length=255)),
+                ('description', models.TextField(help_text='Detailed description of the project.')),
+                ('team_size', models.PositiveIntegerField(help_text='Total number of team members assigned to the project.')),
+                ('start_date', models.DateField(help_text='The date when the project starts.')),
+                ('end_date', models.DateField(help_text='The date when the project ends.')),
+                ('country', models.CharField(help_text='Country where the project is being executed.', max_length=100)),
+                ('budget', models.DecimalField(decimal_places=2, help_text='Total budget allocated for the project.', max_digits=15)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Timestamp when the project was created.')),
+                ('user', models.ForeignKey(help_text='The user who owns this project.', on_delete=django.db.models.deletion.CASCADE, related_name='projects', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ProjectResponse',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('detailed_description', models.TextField(blank=True, help_text='Detailed description of the project response.', null=True)),
+                ('plan', models.TextField(blank=True, help_text='Plan details for the project.', null=True)),
+                ('analysis', models.TextField(help_text="Detailed analysis of the project's feasibility.")),
+                ('feasibility_score', models.IntegerField(help_text='Feasibility score ranging from 1 (lowest) to 10 (highest).', validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(10)])),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Timestamp when the response was recorded.')),
+                ('project', models.OneToOneField(help_text='The project this response belongs to.', on_delete=django.db.models.deletion.CASCADE, related_name='response', to='core.project')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AssignmentOfTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('team_member_number', models.PositiveIntegerField(help_text="The assigned team member's number.")),
+                ('task', models.CharField(help_text='Short title or name of the task.', max_length=255)),
+                ('start_date_time', models.DateTimeField(help_text='Date and time when the task starts.')),
+                ('end_date_time', models.DateTimeField(help_text='Date and time when the task ends.')),
+                ('description', models.TextField(help_text='Detailed description of the task.')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Timestamp when this task assignment was created.')),
+                ('project', models.ForeignKey(help_text='The project this task is assigned to.', on_delete=django.db.models.deletion.CASCADE, related_name='assignments', to='core.project')),
+            ],
+        ),
+    ]
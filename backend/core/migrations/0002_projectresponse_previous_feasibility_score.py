@@ -0,0 +1,18 @@
+# Generated by Django 4.2.19 on 2026-10-19 03:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectresponse',
+            name='previous_feasibility_score',
+            field=models.IntegerField(blank=True, help_text='Feasibility score before the last re-evaluation, kept for comparison.', null=True),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.19 on 2026-10-19 03:57
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0002_projectresponse_previous_feasibility_score'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RateLimitBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(help_text="Identifies the bucket, e.g. 'user:42' or 'global'.", max_length=100, unique=True)),
+                ('tokens', models.FloatField(help_text='Tokens left in the bucket at updated_at.')),
+                ('updated_at', models.DateTimeField(help_text='When tokens was last recalculated.')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='InFlightGeneration',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, help_text='When the generation started.')),
+                ('user', models.ForeignKey(help_text='The user who started the generation.', on_delete=django.db.models.deletion.CASCADE, related_name='in_flight_generations', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
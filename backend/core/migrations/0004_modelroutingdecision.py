@@ -0,0 +1,30 @@
+# Generated by Django 4.2.19 on 2026-10-19 03:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_admission_control'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModelRoutingDecision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prompt_name', models.CharField(help_text="Which prompt was sent, e.g. 'analysis' or 'tasks'.", max_length=50)),
+                ('model', models.CharField(help_text='Model that produced the result that was used.', max_length=255)),
+                ('candidates', models.CharField(help_text='Comma-separated models that were called.', max_length=512)),
+                ('reason', models.CharField(help_text='Why this model was chosen.', max_length=255)),
+                ('prompt_chars', models.PositiveIntegerField(help_text='Size of the prompt in characters.')),
+                ('team_size', models.PositiveIntegerField(blank=True, help_text='Team size of the project, if any.', null=True)),
+                ('timeline_days', models.IntegerField(blank=True, help_text='Project length in days, if any.', null=True)),
+                ('latency_ms', models.PositiveIntegerField(blank=True, help_text='Time until the used result was available, in milliseconds.', null=True)),
+                ('schema_valid', models.BooleanField(default=False, help_text='Whether the output matched the schema without a re-ask.')),
+                ('reasked', models.BooleanField(default=False, help_text='Whether the model had to be asked to fix its output.')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Timestamp when the decision was made.')),
+            ],
+        ),
+    ]
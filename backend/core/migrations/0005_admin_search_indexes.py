@@ -0,0 +1,27 @@
+# Generated by Django 4.2.19 on 2026-10-19 03:58
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_modelroutingdecision'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='assignmentoftask',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('task', 'description', config='english'), name='task_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assignmentoftask',
+            index=models.Index(fields=['project', '-id'], name='task_project_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('title', 'description', config='english'), name='project_search_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.19 on 2026-10-19 03:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_admin_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectresponse',
+            name='provisional',
+            field=models.BooleanField(default=False, help_text='Whether this evaluation came from the local pre-screen instead of the model.'),
+        ),
+        migrations.CreateModel(
+            name='PrescreenDecision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('outcome', models.CharField(choices=[('provisional', 'Provisional evaluation (model call saved)'), ('full_call', 'Sent to the model')], db_index=True, help_text='What the pre-screen decided.', max_length=20)),
+                ('reason', models.CharField(help_text='Which rule or model result led to the decision.', max_length=255)),
+                ('probability', models.FloatField(blank=True, help_text='Feasibility probability from the pre-screen model, if one was used.', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Timestamp when the decision was made.')),
+                ('project', models.ForeignKey(help_text='The project that was pre-screened.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='prescreen_decisions', to='core.project')),
+            ],
+        ),
+    ]
@@ -0,0 +1,110 @@
+# Generated by Django 4.2.19 on 2026-10-19 03:49, then edited: the text
+# columns are converted with convert_to() instead of Django's "USING col::bytea",
+# which reads backslashes in the text as escape sequences and either fails or
+# stores different bytes.
+
+import core.compression
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def text_to_compressed(model_name, name, field):
+    """
+    Changes a text column to a CompressedTextField. Existing values are kept as
+    their UTF-8 bytes, which decompress_text() reads as uncompressed text.
+    Reversing only works while no value has been written compressed.
+    """
+    table = f"core_{model_name}"
+    return migrations.SeparateDatabaseAndState(
+        database_operations=[
+            migrations.RunSQL(
+                f'ALTER TABLE "{table}" ALTER COLUMN "{name}" TYPE bytea USING convert_to("{name}", \'UTF8\')',
+                f'ALTER TABLE "{table}" ALTER COLUMN "{name}" TYPE text USING convert_from("{name}", \'UTF8\')',
+            ),
+        ],
+        state_operations=[
+            migrations.AlterField(model_name=model_name, name=name, field=field),
+        ],
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_prescreen'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompressionDictionary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.BinaryField(help_text='The dictionary bytes.')),
+                ('sample_count', models.PositiveIntegerField(help_text='Number of texts the dictionary was trained on.')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Timestamp when the dictionary was trained.')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ProjectEvaluation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField(help_text='Version number of this evaluation, starting at 1.')),
+                ('detailed_description', core.compression.CompressedTextField(blank=True, help_text='Detailed description of the project response.', null=True)),
+                ('plan', core.compression.CompressedTextField(blank=True, help_text='Plan details for the project.', null=True)),
+                ('analysis', core.compression.CompressedTextField(help_text="Detailed analysis of the project's feasibility.")),
+                ('feasibility_score', models.IntegerField(help_text='Feasibility score ranging from 1 (lowest) to 10 (highest).', validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(10)])),
+                ('provisional', models.BooleanField(default=False, help_text='Whether this evaluation came from the local pre-screen instead of the model.')),
+                ('evaluated_at', models.DateTimeField(help_text='When this version was produced.')),
+                ('superseded_at', models.DateTimeField(auto_now_add=True, help_text='When this version was replaced by a newer one.')),
+            ],
+        ),
+        # The search index covered the description, which can't be indexed
+        # once it is compressed; drop it before converting the column.
+        migrations.RemoveIndex(
+            model_name='assignmentoftask',
+            name='task_search_idx',
+        ),
+        migrations.AddField(
+            model_name='projectresponse',
+            name='evaluated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='When the current version was produced.'),
+        ),
+        migrations.AddField(
+            model_name='projectresponse',
+            name='version',
+            field=models.PositiveIntegerField(default=1, help_text='Version number of the current evaluation; earlier versions are in ProjectEvaluation.'),
+        ),
+        text_to_compressed(
+            'assignmentoftask', 'description',
+            core.compression.CompressedTextField(help_text='Detailed description of the task.'),
+        ),
+        text_to_compressed(
+            'projectresponse', 'analysis',
+            core.compression.CompressedTextField(help_text="Detailed analysis of the project's feasibility."),
+        ),
+        text_to_compressed(
+            'projectresponse', 'detailed_description',
+            core.compression.CompressedTextField(blank=True, help_text='Detailed description of the project response.', null=True),
+        ),
+        text_to_compressed(
+            'projectresponse', 'plan',
+            core.compression.CompressedTextField(blank=True, help_text='Plan details for the project.', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='assignmentoftask',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('task', config='english'), name='task_search_idx'),
+        ),
+        migrations.AddField(
+            model_name='projectevaluation',
+            name='project',
+            field=models.ForeignKey(help_text='The project this evaluation belongs to.', on_delete=django.db.models.deletion.CASCADE, related_name='evaluations', to='core.project'),
+        ),
+        migrations.AddConstraint(
+            model_name='projectevaluation',
+            constraint=models.UniqueConstraint(fields=('project', 'version'), name='unique_project_evaluation_version'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.19 on 2026-10-19 03:58
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0007_evaluation_history_compression'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReplicaPin',
+            fields=[
+                ('user', models.OneToOneField(help_text='The user who wrote.', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='replica_pin', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('pinned_until', models.DateTimeField(help_text='Reads go to the primary until this time.')),
+            ],
+        ),
+    ]
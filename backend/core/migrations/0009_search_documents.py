@@ -0,0 +1,79 @@
+# Generated by Django 4.2.19 on 2026-10-19 04:04, then edited to fill the
+# search documents of the existing rows.
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+from django.db.models import Case, Value, When
+
+SEARCH_DOCUMENT_FIELDS = {
+    'projectresponse': ('analysis', 'plan'),
+    'assignmentoftask': ('task', 'description'),
+}
+
+
+def fill_search_documents(apps, schema_editor):
+    """
+    Same as core.models.update_search_documents(), for the rows written
+    before this migration, a batch at a time.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    db = schema_editor.connection.alias
+    for model_name, fields in SEARCH_DOCUMENT_FIELDS.items():
+        model = apps.get_model('core', model_name)
+        rows = model.objects.using(db).only('pk', *fields).order_by('pk').iterator(chunk_size=500)
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == 500:
+                _update(model, db, fields, batch)
+                batch = []
+        _update(model, db, fields, batch)
+
+
+def _update(model, db, fields, rows):
+    if not rows:
+        return
+    model.objects.using(db).filter(pk__in=[row.pk for row in rows]).update(search_document=Case(
+        *[
+            When(pk=row.pk, then=django.contrib.postgres.search.SearchVector(
+                *[Value(getattr(row, name) or '') for name in fields], config='english'
+            ))
+            for row in rows
+        ],
+        output_field=django.contrib.postgres.search.SearchVectorField(),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_replicapin'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='assignmentoftask',
+            name='task_search_idx',
+        ),
+        migrations.AddField(
+            model_name='assignmentoftask',
+            name='search_document',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, help_text='Full-text search document of the task name and description, used by the admin search.', null=True),
+        ),
+        migrations.AddField(
+            model_name='projectresponse',
+            name='search_document',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, help_text='Full-text search document of the analysis and plan, used by the admin search.', null=True),
+        ),
+        migrations.RunPython(fill_search_documents, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='assignmentoftask',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_document'], name='task_search_document_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectresponse',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_document'], name='response_search_idx'),
+        ),
+    ]
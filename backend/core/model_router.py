@@ -0,0 +1,297 @@
+import contextvars
+import functools
+import json
+import logging
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import date, datetime, timedelta
+
+from django.conf import settings
+
+from .models import ModelRoutingDecision
+from .output_schema import ModelOutputError, parse_model_output
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest sample in the moving average of each model's latency
+LATENCY_SMOOTHING = 0.3
+
+GenerationResult = namedtuple("GenerationResult", ["model", "raw", "data", "errors", "decision_id"])
+
+_latency_lock = threading.Lock()
+_latency_ewma = {}  # model name -> (smoothed latency in seconds, monotonic time of the last sample)
+_probed_at = {}  # model name -> monotonic time of the last probe request
+
+
+@functools.cache
+def _replicate():
+    """
+    Creates the Replicate client, with the API token from settings, on first
+    use. This is the only place that talks to Replicate. The import pulls in
+    httpx and pydantic, so keeping it out of module import time speeds up
+    worker start-up.
+    """
+    import replicate
+    return replicate.Client(api_token=settings.REPLICATE_API_TOKEN)
+
+
+def _cancel_when_set(prediction, cancel_event, finished):
+    cancel_event.wait()
+    if not finished.is_set():
+        try:
+            prediction.cancel()
+        except Exception:
+            logger.warning("Could not cancel prediction %s", prediction.id, exc_info=True)
+
+
+def _stream_replicate(model, prompt, cancel_event):
+    prediction = _replicate().models.predictions.create(model=model, input={"prompt": prompt}, stream=True)
+    finished = threading.Event()
+    if cancel_event is not None:
+        # Cancelling the prediction stops the model on Replicate and ends its
+        # event stream, so a race loser doesn't keep generating (and blocking
+        # its thread) until it finishes on its own.
+        threading.Thread(target=_cancel_when_set, args=(prediction, cancel_event, finished), daemon=True).start()
+    result = ""
+    try:
+        for event in prediction.stream():
+            if cancel_event is not None and cancel_event.is_set():
+                break  # Another model already won the race; stop reading.
+            result += str(event)  # Convert each event to string before concatenating
+    finally:
+        finished.set()
+    return result
+
+
+# Datetime placeholder used in the prompt templates
+_DATETIME_PLACEHOLDER = "YYYY-MM-DDTHH:MM:SS"
+
+
+def _stub_item(template, model, index):
+    # Tasks start today, a day apart; validate_assignments moves them into the project window.
+    start = datetime.combine(date.today(), datetime.min.time()).replace(hour=9) + timedelta(days=index)
+    item = {}
+    for key, value in template.items():
+        if value == _DATETIME_PLACEHOLDER:
+            value = (start + timedelta(hours=8) if key.startswith("end") else start).isoformat()
+        elif key == "team_member_number":
+            value = index + 1
+        elif isinstance(value, str):
+            value = f"Stub {key.replace('_', ' ')} {index + 1} from {model}."
+        elif isinstance(value, (int, float)):
+            value = value or 5
+        item[key] = value
+    return item
+
+
+def _stream_stub(model, prompt, cancel_event):
+    """
+    Local stand-in for the models: fills in the "output" template from the
+    request payload with valid values (one item per team member for task
+    templates), after the configured artificial latency.
+    """
+    delay = settings.MODEL_ROUTING['STUB_LATENCY_SECONDS']
+    if isinstance(delay, dict):
+        delay = delay.get(model, 0)
+    if delay and cancel_event is not None and cancel_event.wait(delay):
+        return ""
+    if delay and cancel_event is None:
+        time.sleep(delay)
+    try:
+        payload = json.loads(prompt)
+        template = payload.get("output", {})
+    except (ValueError, AttributeError):
+        return "{}"
+    if "team_member_number" in template:
+        team_size = max(int(payload.get("input", {}).get("team_size") or 1), 1)
+        return json.dumps([_stub_item(template, model, index) for index in range(team_size)])
+    return json.dumps(_stub_item(template, model, 0))
+
+
+_PROVIDERS = {
+    'replicate': _stream_replicate,
+    'stub': _stream_stub,
+}
+
+
+def record_latency(model, seconds):
+    """
+    Adds a sample to the model's moving average. An average older than
+    MODEL_ROUTING['LATENCY_PROBE_SECONDS'] is stale and replaced by the
+    sample, so a model that was slow once doesn't stay slow forever.
+    """
+    now = time.monotonic()
+    with _latency_lock:
+        previous = _latency_ewma.get(model)
+        if previous is None or now - previous[1] >= settings.MODEL_ROUTING['LATENCY_PROBE_SECONDS']:
+            _latency_ewma[model] = (seconds, now)
+        else:
+            _latency_ewma[model] = (LATENCY_SMOOTHING * seconds + (1 - LATENCY_SMOOTHING) * previous[0], now)
+
+
+def latency_stats():
+    """
+    Returns the smoothed latency (seconds) of each model seen by this process.
+    """
+    with _latency_lock:
+        return {model: latency for model, (latency, _) in _latency_ewma.items()}
+
+
+def _claim_probe(model):
+    """
+    True if a model avoided for being over the latency budget is due a probe
+    request: it has had no sample or probe for LATENCY_PROBE_SECONDS. Claiming
+    restarts the wait, so concurrent requests don't all probe at once.
+    """
+    now = time.monotonic()
+    with _latency_lock:
+        last = max(_latency_ewma[model][1], _probed_at.get(model, float("-inf")))
+        if now - last < settings.MODEL_ROUTING['LATENCY_PROBE_SECONDS']:
+            return False
+        _probed_at[model] = now
+        return True
+
+
+def call_model(model, prompt, cancel_event=None):
+    """
+    Sends a prompt to one model and returns the full output text.
+    """
+    started = time.monotonic()
+    result = _PROVIDERS[settings.MODEL_ROUTING['PROVIDER']](model, prompt, cancel_event)
+    if cancel_event is None or not cancel_event.is_set():
+        record_latency(model, time.monotonic() - started)
+    return result
+
+
+def _project_features(project):
+    if project is None:
+        return None, None
+    return project.team_size, (project.end_date - project.start_date).days
+
+
+def route(prompt, project=None):
+    """
+    Picks the model for a prompt.
+
+    Large prompts and complex projects (many team members or a long timeline)
+    prefer the large model, everything else the default one. If the preferred
+    model's recent latency is over the budget, the other model is used when it
+    is faster, apart from one probe request every LATENCY_PROBE_SECONDS that
+    measures the preferred model again.
+
+    Returns:
+        tuple: (model name, reason).
+    """
+    routing = settings.MODEL_ROUTING
+    team_size, timeline_days = _project_features(project)
+
+    if len(prompt) > routing['LARGE_PROMPT_CHARS']:
+        preferred, other, reason = routing['LARGE_MODEL'], routing['DEFAULT_MODEL'], "large prompt"
+    elif team_size is not None and team_size > routing['LARGE_TEAM_SIZE']:
+        preferred, other, reason = routing['LARGE_MODEL'], routing['DEFAULT_MODEL'], "large team"
+    elif timeline_days is not None and timeline_days > routing['LONG_TIMELINE_DAYS']:
+        preferred, other, reason = routing['LARGE_MODEL'], routing['DEFAULT_MODEL'], "long timeline"
+    else:
+        preferred, other, reason = routing['DEFAULT_MODEL'], routing['LARGE_MODEL'], "default"
+
+    stats = latency_stats()
+    preferred_latency, other_latency = stats.get(preferred), stats.get(other)
+    if (
+        preferred_latency is not None
+        and preferred_latency > routing['LATENCY_BUDGET_SECONDS']
+        and (other_latency is None or other_latency < preferred_latency)
+    ):
+        if _claim_probe(preferred):
+            return preferred, f"{reason}; probing {preferred} latency ({preferred_latency:.1f}s)"
+        return other, f"{reason}; {preferred} over latency budget ({preferred_latency:.1f}s)"
+    return preferred, reason
+
+
+def _call_and_parse(model, prompt, schema, cancel_event=None):
+    raw = call_model(model, prompt, cancel_event)
+    try:
+        return model, raw, parse_model_output(raw, schema), []
+    except ModelOutputError as e:
+        return model, raw, None, e.errors
+
+
+def _race(models, prompt, schema):
+    """
+    Sends the prompt to every model at once and returns the first result that
+    matches the schema, cancelling the other streams. If none is valid, the
+    first result to finish is returned.
+    """
+    cancel_event = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=len(models))
+    # Each call runs in a copy of the caller's context so its log lines keep the correlation ids.
+    pending = {
+        executor.submit(contextvars.copy_context().run, _call_and_parse, model, prompt, schema, cancel_event)
+        for model in models
+    }
+    first_result = None
+    try:
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception:
+                    logger.exception("Error calling Replicate model during race")
+                    continue
+                if result[2] is not None:
+                    return result
+                first_result = first_result or result
+        if first_result is None:
+            raise RuntimeError("every raced model failed")
+        return first_result
+    finally:
+        cancel_event.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def generate(prompt, schema, project=None, prompt_name=""):
+    """
+    Routes a prompt to a model (or races the configured models), parses the
+    output against the schema and records the decision and its outcome.
+
+    Returns:
+        GenerationResult: data is None (and errors is set) if the output didn't
+        match the schema even after local repair.
+    """
+    routing = settings.MODEL_ROUTING
+    started = time.monotonic()
+    if routing['RACE']:
+        candidates = [routing['DEFAULT_MODEL'], routing['LARGE_MODEL']]
+        reason = "race"
+        model, raw, data, errors = _race(candidates, prompt, schema)
+    else:
+        model, reason = route(prompt, project)
+        candidates = [model]
+        model, raw, data, errors = _call_and_parse(model, prompt, schema)
+
+    team_size, timeline_days = _project_features(project)
+    decision = ModelRoutingDecision.objects.create(
+        prompt_name=prompt_name,
+        model=model,
+        candidates=",".join(candidates),
+        reason=reason[:255],
+        prompt_chars=len(prompt),
+        team_size=team_size,
+        timeline_days=timeline_days,
+        latency_ms=int((time.monotonic() - started) * 1000),
+        schema_valid=data is not None,
+    )
+    logger.info(
+        "Routed %s prompt to %s", prompt_name or "model", model,
+        extra={"model": model, "reason": reason, "latency_ms": decision.latency_ms, "schema_valid": data is not None},
+    )
+    return GenerationResult(model, raw, data, errors, decision.pk)
+
+
+def record_reask(result):
+    """
+    Marks a routing decision whose output had to be sent back to the model.
+    """
+    ModelRoutingDecision.objects.filter(pk=result.decision_id).update(reasked=True)
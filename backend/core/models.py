@@ -1,8 +1,42 @@
-from django.db import models
+from django.db import connections, models, router
+from django.db.models import Case, Value, When
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.contrib.auth.models import User
 from django.utils.timezone import now
 
+from .compression import CompressedTextField, stored_value
+
+# Full-text search expressions used by the admin. The GIN indexes below are
+# built on exactly these expressions so searches can use them.
+PROJECT_SEARCH_VECTOR = SearchVector("title", "description", config="english")
+
+
+def update_search_documents(objects):
+    """
+    Fills the search_document of saved ProjectResponse or AssignmentOfTask
+    rows from the text in their SEARCH_DOCUMENT_FIELDS, in one UPDATE. The
+    database can't read compressed text, so the search document is built
+    here from the decompressed values. Only PostgreSQL has search documents;
+    on other databases this does nothing.
+    """
+    objects = [obj for obj in objects if obj.pk is not None]
+    if not objects:
+        return
+    model = type(objects[0])
+    if connections[router.db_for_write(model)].vendor != "postgresql":
+        return
+    model.objects.filter(pk__in=[obj.pk for obj in objects]).update(search_document=Case(
+        *[
+            When(pk=obj.pk, then=SearchVector(
+                *[Value(getattr(obj, name) or "") for name in model.SEARCH_DOCUMENT_FIELDS], config="english"
+            ))
+            for obj in objects
+        ],
+        output_field=SearchVectorField(),
+    ))
+
 
 # Model to store project details
 class Project(models.Model):
@@ -55,6 +89,11 @@ class Project(models.Model):
         help_text="Timestamp when the project was created."
     )  # Auto-generates the timestamp upon creation.
 
+    class Meta:
+        indexes = [
+            GinIndex(PROJECT_SEARCH_VECTOR, name="project_search_idx"),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -62,8 +101,9 @@ class Project(models.Model):
 # Model for storing a project's feasibility response
 class ProjectResponse(models.Model):
     """
-    Represents a feasibility response for a project. Each project can only have
-    one response that includes analysis, feasibility score, and optional plans.
+    Represents the current feasibility response for a project. Each project can
+    only have one response that includes analysis, feasibility score, and
+    optional plans; the versions it replaced are kept in ProjectEvaluation.
     """
 
     project = models.OneToOneField(
@@ -73,36 +113,164 @@ class ProjectResponse(models.Model):
         help_text="The project this response belongs to."
     )  # Enforces a strict one-to-one relationship.
 
-    detailed_description = models.TextField(
+    detailed_description = CompressedTextField(
         blank=True,
         null=True,
         help_text="Detailed description of the project response."
-    )  # Optional field for an extended response.
+    )  # Optional field for an extended response, stored compressed.
 
-    plan = models.TextField(
+    plan = CompressedTextField(
         blank=True,
         null=True,
         help_text="Plan details for the project."
-    )  # Optional field for project planning.
+    )  # Optional field for project planning, stored compressed.
 
-    analysis = models.TextField(
+    analysis = CompressedTextField(
         help_text="Detailed analysis of the project's feasibility."
-    )  # Required field for project assessment.
+    )  # Required field for project assessment, stored compressed.
 
     feasibility_score = models.IntegerField(
         validators=[MinValueValidator(1), MaxValueValidator(10)],
         help_text="Feasibility score ranging from 1 (lowest) to 10 (highest)."
     )  # Restricts the score to a valid range.
 
+    previous_feasibility_score = models.IntegerField(
+        blank=True,
+        null=True,
+        help_text="Feasibility score before the last re-evaluation, kept for comparison."
+    )  # Set by the rescore command so old and new scores can be compared.
+
+    provisional = models.BooleanField(
+        default=False,
+        help_text="Whether this evaluation came from the local pre-screen instead of the model."
+    )  # Provisional evaluations are left out of the pre-screen's training data.
+
+    version = models.PositiveIntegerField(
+        default=1,
+        help_text="Version number of the current evaluation; earlier versions are in ProjectEvaluation."
+    )  # Incremented by every re-evaluation.
+
+    evaluated_at = models.DateTimeField(
+        default=now,
+        help_text="When the current version was produced."
+    )  # Copied to the ProjectEvaluation row when this version is replaced.
+
     created_at = models.DateTimeField(
         auto_now_add=True,
         help_text="Timestamp when the response was recorded."
     )  # Auto-generates creation timestamp.
 
+    search_document = SearchVectorField(
+        null=True,
+        editable=False,
+        help_text="Full-text search document of the analysis and plan, used by the admin search."
+    )  # Filled by update_search_documents(), since the text itself is stored compressed.
+
+    SEARCH_DOCUMENT_FIELDS = ("analysis", "plan")
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["search_document"], name="response_search_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_search_documents([self])
+
+    def supersede(self, fields):
+        """
+        Replaces the current version with a new evaluation (field values as
+        returned by generate_project_analysis) without saving anything.
+
+        Returns:
+            ProjectEvaluation: unsaved copy of the replaced version, reusing
+            its compressed text as stored.
+        """
+        archived = ProjectEvaluation(
+            project_id=self.project_id,
+            version=self.version,
+            detailed_description=stored_value(self, "detailed_description"),
+            plan=stored_value(self, "plan"),
+            analysis=stored_value(self, "analysis"),
+            feasibility_score=self.feasibility_score,
+            provisional=self.provisional,
+            evaluated_at=self.evaluated_at,
+        )
+        self.previous_feasibility_score = self.feasibility_score
+        for name, value in fields.items():
+            setattr(self, name, value)
+        self.version += 1
+        self.evaluated_at = now()
+        return archived
+
     def __str__(self):
         return f"Response for {self.project} - Score: {self.feasibility_score}"
 
 
+# Model for keeping the evaluations a ProjectResponse has replaced
+class ProjectEvaluation(models.Model):
+    """
+    An earlier version of a project's evaluation. Rows are only ever added:
+    each re-evaluation moves the current ProjectResponse here before
+    overwriting it, so a project's full history is its ProjectEvaluation rows
+    plus the ProjectResponse.
+    """
+
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        related_name="evaluations",
+        help_text="The project this evaluation belongs to."
+    )  # A project has any number of earlier evaluations.
+
+    version = models.PositiveIntegerField(
+        help_text="Version number of this evaluation, starting at 1."
+    )  # Unique per project.
+
+    detailed_description = CompressedTextField(
+        blank=True,
+        null=True,
+        help_text="Detailed description of the project response."
+    )  # Stored compressed.
+
+    plan = CompressedTextField(
+        blank=True,
+        null=True,
+        help_text="Plan details for the project."
+    )  # Stored compressed.
+
+    analysis = CompressedTextField(
+        help_text="Detailed analysis of the project's feasibility."
+    )  # Stored compressed.
+
+    feasibility_score = models.IntegerField(
+        validators=[MinValueValidator(1), MaxValueValidator(10)],
+        help_text="Feasibility score ranging from 1 (lowest) to 10 (highest)."
+    )  # Score of this version.
+
+    provisional = models.BooleanField(
+        default=False,
+        help_text="Whether this evaluation came from the local pre-screen instead of the model."
+    )  # Same meaning as on ProjectResponse.
+
+    evaluated_at = models.DateTimeField(
+        help_text="When this version was produced."
+    )  # Copied from the ProjectResponse.
+
+    superseded_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text="When this version was replaced by a newer one."
+    )  # Auto-generates the timestamp.
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["project", "version"], name="unique_project_evaluation_version"),
+        ]
+
+    def __str__(self):
+        return f"Evaluation v{self.version} for {self.project} - Score: {self.feasibility_score}"
+
+
 # Model for task assignments within a project
 class AssignmentOfTask(models.Model):
     """
@@ -135,15 +303,33 @@ class AssignmentOfTask(models.Model):
         help_text="Date and time when the task ends."
     )  # Defines the expected completion time.
 
-    description = models.TextField(
+    description = CompressedTextField(
         help_text="Detailed description of the task."
-    )  # Provides a longer description of the task.
+    )  # Provides a longer description of the task, stored compressed.
 
     created_at = models.DateTimeField(
         auto_now_add=True,
         help_text="Timestamp when this task assignment was created."
     )  # Auto-generates the timestamp.
 
+    search_document = SearchVectorField(
+        null=True,
+        editable=False,
+        help_text="Full-text search document of the task name and description, used by the admin search."
+    )  # Filled by update_search_documents(), since the description is stored compressed.
+
+    SEARCH_DOCUMENT_FIELDS = ("task", "description")
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["search_document"], name="task_search_document_idx"),
+            models.Index(fields=["project", "-id"], name="task_project_id_idx"),  # Admin filter + keyset paging
+        ]
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_search_documents([self])
+
     @property
     def duration(self):
         """
@@ -164,3 +350,221 @@ class AssignmentOfTask(models.Model):
         including the task name and its calculated duration.
         """
         return f"{self.task} (Duration: {self.duration})"
+
+
+# Model for rate limiting the model-backed endpoints across worker processes
+class RateLimitBucket(models.Model):
+    """
+    Stores the state of one token bucket (per user or global) used to limit
+    calls to the model-backed endpoints. Rows are locked with SELECT ... FOR
+    UPDATE so every gunicorn worker sees the same bucket.
+    """
+
+    key = models.CharField(
+        max_length=100,
+        unique=True,
+        help_text="Identifies the bucket, e.g. 'user:42' or 'global'."
+    )  # One row per bucket.
+
+    tokens = models.FloatField(
+        help_text="Tokens left in the bucket at updated_at."
+    )  # Refilled lazily whenever the bucket is read.
+
+    updated_at = models.DateTimeField(
+        help_text="When tokens was last recalculated."
+    )  # Used to compute the refill since the last request.
+
+    def __str__(self):
+        return f"{self.key}: {self.tokens:.2f} tokens"
+
+
+# Model for tracking model generations currently running
+class InFlightGeneration(models.Model):
+    """
+    Represents a model generation that is currently running. Used to cap the
+    number of concurrent generations so they can't occupy every worker thread.
+    """
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="in_flight_generations",
+        help_text="The user who started the generation."
+    )  # Associates the generation with a user.
+
+    started_at = models.DateTimeField(
+        default=now,
+        db_index=True,
+        help_text="When the generation started."
+    )  # Rows older than the in-flight timeout are treated as abandoned.
+
+    def __str__(self):
+        return f"Generation for {self.user} started at {self.started_at}"
+
+
+# Model for pinning a user's reads to the primary database after a write
+class ReplicaPin(models.Model):
+    """
+    Marks a user whose recent write may not have reached the read replicas
+    yet. Until pinned_until, that user's requests read from the primary, in
+    every worker process (see core/replicas.py).
+    """
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="replica_pin",
+        help_text="The user who wrote."
+    )  # One row per user, updated on each write.
+
+    pinned_until = models.DateTimeField(
+        help_text="Reads go to the primary until this time."
+    )  # REPLICAS['PIN_SECONDS'] after the last write.
+
+    def __str__(self):
+        return f"{self.user} pinned to the primary until {self.pinned_until}"
+
+
+# Model for recording which model served each generation and how it went
+class ModelRoutingDecision(models.Model):
+    """
+    Records one routing decision made by core.model_router: which model(s) were
+    called, why, the request features the decision was based on and the
+    outcome. Used to tune the routing policy from real traffic.
+    """
+
+    prompt_name = models.CharField(
+        max_length=50,
+        help_text="Which prompt was sent, e.g. 'analysis' or 'tasks'."
+    )  # Separates decisions for the two prompts.
+
+    model = models.CharField(
+        max_length=255,
+        help_text="Model that produced the result that was used."
+    )  # The winner when racing.
+
+    candidates = models.CharField(
+        max_length=512,
+        help_text="Comma-separated models that were called."
+    )  # More than one when racing.
+
+    reason = models.CharField(
+        max_length=255,
+        help_text="Why this model was chosen."
+    )  # Human-readable routing reason.
+
+    prompt_chars = models.PositiveIntegerField(
+        help_text="Size of the prompt in characters."
+    )  # Request feature used by the policy.
+
+    team_size = models.PositiveIntegerField(
+        blank=True,
+        null=True,
+        help_text="Team size of the project, if any."
+    )  # Request feature used by the policy.
+
+    timeline_days = models.IntegerField(
+        blank=True,
+        null=True,
+        help_text="Project length in days, if any."
+    )  # Request feature used by the policy.
+
+    latency_ms = models.PositiveIntegerField(
+        blank=True,
+        null=True,
+        help_text="Time until the used result was available, in milliseconds."
+    )  # Outcome.
+
+    schema_valid = models.BooleanField(
+        default=False,
+        help_text="Whether the output matched the schema without a re-ask."
+    )  # Outcome.
+
+    reasked = models.BooleanField(
+        default=False,
+        help_text="Whether the model had to be asked to fix its output."
+    )  # Outcome.
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text="Timestamp when the decision was made."
+    )  # Auto-generates the timestamp.
+
+    def __str__(self):
+        return f"{self.prompt_name} -> {self.model} ({self.reason})"
+
+
+# Model for recording what the local pre-screen decided for each project
+class PrescreenDecision(models.Model):
+    """
+    Records one decision of core.prescreen: whether a project got a provisional
+    evaluation straight away (saving a model call) or was sent to the model.
+    """
+
+    OUTCOME_PROVISIONAL = "provisional"
+    OUTCOME_FULL_CALL = "full_call"
+    OUTCOME_CHOICES = [
+        (OUTCOME_PROVISIONAL, "Provisional evaluation (model call saved)"),
+        (OUTCOME_FULL_CALL, "Sent to the model"),
+    ]
+
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="prescreen_decisions",
+        help_text="The project that was pre-screened."
+    )  # Kept when the project is deleted so the counters stay correct.
+
+    outcome = models.CharField(
+        max_length=20,
+        choices=OUTCOME_CHOICES,
+        db_index=True,
+        help_text="What the pre-screen decided."
+    )  # Counting provisional outcomes gives the calls saved.
+
+    reason = models.CharField(
+        max_length=255,
+        help_text="Which rule or model result led to the decision."
+    )  # Human-readable reason.
+
+    probability = models.FloatField(
+        blank=True,
+        null=True,
+        help_text="Feasibility probability from the pre-screen model, if one was used."
+    )  # Used to tune the thresholds.
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text="Timestamp when the decision was made."
+    )  # Auto-generates the timestamp.
+
+    def __str__(self):
+        return f"{self.project_id}: {self.outcome} ({self.reason})"
+
+
+# Model for the preset dictionaries used to compress large text fields
+class CompressionDictionary(models.Model):
+    """
+    A zlib preset dictionary trained on stored text (see core.compression).
+    New values are compressed with the newest dictionary; stored values name
+    the dictionary they were compressed with, so rows are never changed or
+    deleted while data refers to them.
+    """
+
+    data = models.BinaryField(
+        help_text="The dictionary bytes."
+    )  # At most 32 KB, zlib's window size.
+
+    sample_count = models.PositiveIntegerField(
+        help_text="Number of texts the dictionary was trained on."
+    )  # For reference.
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text="Timestamp when the dictionary was trained."
+    )  # Auto-generates the timestamp.
+
+    def __str__(self):
+        return f"Dictionary {self.pk} ({len(self.data)} bytes, {self.sample_count} samples)"
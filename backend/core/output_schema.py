@@ -0,0 +1,278 @@
+import json
+import math
+import re
+
+_NUMBER_RE = re.compile(r'-?\d+(?:\.\d+)?')
+_CLOSERS = {'{': '}', '[': ']'}
+
+
+class ModelOutputError(ValueError):
+    """
+    Raised when the model output can't be parsed or repaired into something
+    that matches the expected schema.
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__("; ".join(errors))
+
+
+class OutputSchema:
+    """
+    Describes the JSON the model is asked to return and turns raw (possibly
+    malformed) output into clean Python data.
+
+    Args:
+        fields: mapping of field name to type (str, int or float).
+        required: field names that must be present.
+        ranges: mapping of numeric field name to (min, max); values are clamped.
+        many: True if the output is a list of objects (a single object is
+              accepted and wrapped in a list).
+
+    The per-field converters are built once, when the schema is defined, so
+    parsing an output only runs the prepared converters.
+    """
+
+    def __init__(self, fields, required=(), ranges=None, many=False):
+        self.fields = fields
+        self.required = tuple(required)
+        self.many = many
+        ranges = ranges or {}
+        self._converters = {
+            name: _make_converter(name, field_type, ranges.get(name))
+            for name, field_type in fields.items()
+        }
+
+    def example(self):
+        """
+        Returns a short description of the expected format, used in re-ask prompts.
+        """
+        item = {name: field_type.__name__ for name, field_type in self.fields.items()}
+        return json.dumps([item] if self.many else item)
+
+    def coerce_item(self, item):
+        """
+        Converts one object to the schema. Returns (clean dict, list of errors).
+        """
+        if not isinstance(item, dict):
+            return None, [f"expected an object, got {type(item).__name__}"]
+
+        clean, errors = {}, []
+        for name, convert in self._converters.items():
+            if item.get(name) is None:
+                if name in self.required:
+                    errors.append(f"missing required field '{name}'")
+                continue
+            try:
+                clean[name] = convert(item[name])
+            except (TypeError, ValueError) as e:
+                errors.append(str(e))
+        return clean, errors
+
+    def coerce(self, data):
+        """
+        Converts parsed JSON to the schema, raising ModelOutputError if nothing
+        usable is left. For list schemas, invalid items are dropped as long as
+        at least one valid item remains.
+        """
+        if not self.many:
+            if isinstance(data, list) and len(data) == 1:
+                data = data[0]
+            clean, errors = self.coerce_item(data)
+            if errors:
+                raise ModelOutputError(errors)
+            return clean
+
+        items = data if isinstance(data, list) else [data]
+        clean_items, errors = [], []
+        for index, item in enumerate(items):
+            clean, item_errors = self.coerce_item(item)
+            if item_errors:
+                errors.extend(f"item {index + 1}: {error}" for error in item_errors)
+            else:
+                clean_items.append(clean)
+        if not clean_items:
+            raise ModelOutputError(errors or ["no items returned"])
+        return clean_items
+
+
+def _make_converter(name, field_type, value_range):
+    """
+    Builds the function that converts a raw value for one field.
+    """
+    if field_type is str:
+        def convert(value):
+            if isinstance(value, (dict, list)):
+                return json.dumps(value)
+            return str(value)
+        return convert
+
+    def convert(value):
+        if isinstance(value, bool):
+            raise ValueError(f"field '{name}' must be a number, got {value!r}")
+        if isinstance(value, str):
+            # Accept "7", "7.5" or "7/10" style answers.
+            match = _NUMBER_RE.search(value)
+            if match is None:
+                raise ValueError(f"field '{name}' must be a number, got {value!r}")
+            value = float(match.group(0))
+        if not isinstance(value, (int, float)):
+            raise ValueError(f"field '{name}' must be a number, got {value!r}")
+        if not math.isfinite(value):
+            # Infinity, NaN or an overflowing literal like 1e400.
+            raise ValueError(f"field '{name}' must be a finite number, got {value!r}")
+        number = field_type(round(value)) if field_type is int else field_type(value)
+        if value_range is not None:
+            number = min(max(number, value_range[0]), value_range[1])
+        return number
+    return convert
+
+
+def _extract_json_text(text, many=False):
+    """
+    Returns the text from the first opening bracket of the expected JSON on,
+    dropping any chatter the model put before it. The bracket the schema
+    expects ('[' for lists, '{' for objects) is looked for first, so chatter
+    like "[note]" before an object isn't taken for the JSON; the other one is
+    only used if the expected one is missing.
+    """
+    for bracket in ('[', '{') if many else ('{', '['):
+        start = text.find(bracket)
+        if start != -1:
+            return text[start:]
+    return text
+
+
+def _closes_string(text, index):
+    """
+    Decides whether the quote at text[index] ends a string: a real closing quote
+    is followed (after whitespace) by ',', ':', '}', ']' or the end of the text.
+    """
+    for char in text[index + 1:]:
+        if not char.isspace():
+            return char in ',:}]'
+    return True
+
+
+def repair_json_text(text):
+    """
+    Fixes the most common ways the model breaks JSON:
+      - trailing commas before '}' or ']'
+      - unescaped double quotes inside strings
+      - output cut off mid-string or before the closing brackets
+      - trailing text after the JSON value
+    """
+    out = []
+    stack = []
+    in_string = False
+    escaped = False
+
+    for index, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                if not _closes_string(text, index):
+                    out.append('\\"')
+                    continue
+                in_string = False
+            elif char == '\n':
+                out.append('\\n')
+                continue
+            out.append(char)
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append(_CLOSERS[char])
+        elif char in '}]':
+            # Drop a trailing comma before the closing bracket.
+            while out and (out[-1].isspace() or out[-1] == ','):
+                out.pop()
+            if stack:
+                stack.pop()
+            out.append(char)
+            if not stack:
+                break  # Ignore anything after the outermost value.
+            continue
+        out.append(char)
+
+    # Close whatever the truncation left open.
+    if in_string:
+        if escaped:
+            out.pop()
+        out.append('"')
+    repaired = ''.join(out).rstrip()
+    if stack:
+        repaired = repaired.rstrip(',')
+        if repaired.endswith(':'):
+            repaired += ' null'
+        repaired += ''.join(reversed(stack))
+    return repaired
+
+
+def parse_model_output(text, schema):
+    """
+    Parses raw model output against a schema, repairing it locally if needed.
+
+    Returns the clean data, or raises ModelOutputError when the output can't be
+    repaired (the caller may then ask the model to correct it).
+    """
+    candidate = _extract_json_text(text or "", schema.many).strip()
+    if not candidate:
+        raise ModelOutputError(["empty output"])
+    try:
+        data = json.loads(candidate)
+    except json.JSONDecodeError:
+        try:
+            data = json.loads(repair_json_text(candidate), strict=False)
+        except json.JSONDecodeError as e:
+            raise ModelOutputError([f"invalid JSON: {e}"])
+    return schema.coerce(data)
+
+
+def build_reask_prompt(raw_output, errors, schema):
+    """
+    Builds a short follow-up prompt asking the model to fix only the format of
+    its previous output, instead of regenerating the whole answer.
+    """
+    return json.dumps({
+        "prompt": {
+            "instructions": [
+                "Your previous answer was not valid JSON in the required format.",
+                "Problems found: " + "; ".join(errors[:10]),
+                "Return the same content as valid JSON in exactly this format: " + schema.example(),
+                "Do not include any additional text or commentary."
+            ]
+        },
+        "previous_answer": raw_output,
+    })
+
+
+# Output of the feasibility analysis prompt (analyse_project_details)
+ANALYSIS_SCHEMA = OutputSchema(
+    fields={
+        "detailed_description": str,
+        "plan": str,
+        "analysis": str,
+        "feasibility_score": int,
+    },
+    required=("analysis", "feasibility_score"),
+    ranges={"feasibility_score": (1, 10)},
+)
+
+# Output of the task allocation prompt (create_project_tasks)
+TASKS_SCHEMA = OutputSchema(
+    fields={
+        "team_member_number": int,
+        "task": str,
+        "start_date_time": str,
+        "end_date_time": str,
+        "description": str,
+    },
+    required=("team_member_number", "task", "start_date_time", "end_date_time"),
+    many=True,
+)
@@ -0,0 +1,235 @@
+import json
+import logging
+import math
+import os
+import threading
+from collections import namedtuple
+
+from django.conf import settings
+from django.db.models import Count
+
+from .models import PrescreenDecision, ProjectResponse
+
+logger = logging.getLogger(__name__)
+
+PrescreenResult = namedtuple("PrescreenResult", ["feasibility_score", "analysis", "reason", "probability"])
+
+# Project features the pre-screen model is trained on, in order
+FEATURES = ("team_size", "log_budget", "duration_days", "log_budget_per_member_day", "description_words")
+
+
+def project_features(project):
+    """
+    Numeric features of a project for the pre-screen model.
+    """
+    budget = max(float(project.budget), 0.0)
+    duration_days = (project.end_date - project.start_date).days + 1
+    member_days = max(project.team_size * duration_days, 1)
+    return [
+        float(project.team_size),
+        math.log1p(budget),
+        float(duration_days),
+        math.log1p(budget / member_days),
+        float(len(project.description.split())),
+    ]
+
+
+def rule_violations(project):
+    """
+    Returns the reasons a project can't be feasible as specified, if any.
+    """
+    problems = []
+    if project.end_date < project.start_date:
+        problems.append("The end date is before the start date.")
+    if project.budget <= 0:
+        problems.append("The project has no budget.")
+    if project.team_size <= 0:
+        problems.append("The project has no team members.")
+    return problems
+
+
+class FeasibilityModel:
+    """
+    Logistic regression predicting the probability that the model would rate
+    a project feasible, from project_features(). Training needs NumPy;
+    predictions only need the stored weights.
+    """
+
+    def __init__(self, mean, std, weights, bias, trained_on=0):
+        self.mean = mean
+        self.std = std
+        self.weights = weights
+        self.bias = bias
+        self.trained_on = trained_on
+
+    def predict(self, features):
+        z = self.bias + sum(
+            weight * (value - mean) / std
+            for weight, value, mean, std in zip(self.weights, features, self.mean, self.std)
+        )
+        # Numerically stable sigmoid
+        if z >= 0:
+            return 1.0 / (1.0 + math.exp(-z))
+        return math.exp(z) / (1.0 + math.exp(z))
+
+    @classmethod
+    def train(cls, rows, labels, epochs=2000, learning_rate=0.1, l2=0.01):
+        """
+        Fits the weights with batch gradient descent on standardized features.
+
+        Raises:
+            ImportError: if NumPy is not installed.
+        """
+        import numpy as np
+
+        X = np.asarray(rows, dtype=float)
+        y = np.asarray(labels, dtype=float)
+        mean = X.mean(axis=0)
+        std = X.std(axis=0)
+        std[std == 0] = 1.0
+        X = (X - mean) / std
+
+        weights = np.zeros(X.shape[1])
+        bias = 0.0
+        for _ in range(epochs):
+            predictions = 1.0 / (1.0 + np.exp(-np.clip(X @ weights + bias, -30, 30)))
+            error = predictions - y
+            weights -= learning_rate * (X.T @ error / len(y) + l2 * weights)
+            bias -= learning_rate * error.mean()
+
+        return cls(mean.tolist(), std.tolist(), weights.tolist(), float(bias), trained_on=len(y))
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        if data.get("features") != list(FEATURES):
+            raise ValueError("model was trained on different features")
+        return cls(data["mean"], data["std"], data["weights"], data["bias"], data.get("trained_on", 0))
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        data = {
+            "features": list(FEATURES),
+            "mean": self.mean,
+            "std": self.std,
+            "weights": self.weights,
+            "bias": self.bias,
+            "trained_on": self.trained_on,
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+
+def training_data():
+    """
+    Features and feasible/infeasible labels from the stored model evaluations
+    (provisional ones are skipped, they came from the pre-screen itself).
+    """
+    threshold = settings.PRESCREEN['FEASIBLE_SCORE']
+    responses = ProjectResponse.objects.filter(provisional=False).select_related("project").iterator()
+    rows, labels = [], []
+    for response in responses:
+        rows.append(project_features(response.project))
+        labels.append(1 if response.feasibility_score > threshold else 0)
+    return rows, labels
+
+
+_model_lock = threading.Lock()
+_model_cache = {}  # path -> (mtime, FeasibilityModel or None)
+
+
+def load_model():
+    """
+    Returns the trained model from PRESCREEN['MODEL_PATH'], or None if there
+    is none. Reloaded when the file changes, so a retrain needs no restart.
+    """
+    path = settings.PRESCREEN['MODEL_PATH']
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+
+    with _model_lock:
+        cached = _model_cache.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        try:
+            model = FeasibilityModel.load(path)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Ignoring unusable pre-screen model %s: %s", path, e)
+            model = None
+        _model_cache[path] = (mtime, model)
+        return model
+
+
+def prescreen(project):
+    """
+    Decides whether a project needs the full model evaluation. Projects that
+    break a basic rule, or that the pre-screen model is confident are
+    infeasible, get a provisional result instead; every decision is recorded
+    in PrescreenDecision.
+
+    Returns:
+        PrescreenResult, or None if the model call is needed.
+    """
+    config = settings.PRESCREEN
+    if not config['ENABLED']:
+        return None
+
+    # 1. Deterministic rules.
+    result = None
+    problems = rule_violations(project)
+    if problems:
+        result = PrescreenResult(
+            feasibility_score=1,
+            analysis="Provisional evaluation: the project is not feasible as specified. " + " ".join(problems)
+                     + " Request a re-evaluation for a full analysis.",
+            reason="rules: " + " ".join(problems),
+            probability=None,
+        )
+
+    # 2. The trained model, if there is one.
+    probability = None
+    if result is None:
+        model = load_model()
+        if model is not None:
+            probability = model.predict(project_features(project))
+            if probability <= config['SHORT_CIRCUIT_BELOW']:
+                result = PrescreenResult(
+                    feasibility_score=max(1, min(10, round(1 + 9 * probability))),
+                    analysis=(
+                        "Provisional evaluation: projects with a similar team size, budget and timeline "
+                        f"have been rated infeasible (estimated feasibility {probability:.0%}). "
+                        "Request a re-evaluation for a full analysis."
+                    ),
+                    reason=f"model: p={probability:.3f} <= {config['SHORT_CIRCUIT_BELOW']}",
+                    probability=probability,
+                )
+
+    # 3. Record the decision.
+    PrescreenDecision.objects.create(
+        project=project,
+        outcome=PrescreenDecision.OUTCOME_PROVISIONAL if result else PrescreenDecision.OUTCOME_FULL_CALL,
+        reason=(result.reason if result else "passed" if probability is None else f"model: p={probability:.3f}")[:255],
+        probability=probability,
+    )
+    if result:
+        logger.info("Pre-screen saved a model call: %s", result.reason, extra={"project_id": project.id})
+    return result
+
+
+def prescreen_stats():
+    """
+    Counts of pre-screen decisions by outcome, including the model calls saved.
+    """
+    counts = dict(PrescreenDecision.objects.values_list("outcome").annotate(count=Count("id")).order_by())
+    saved = counts.get(PrescreenDecision.OUTCOME_PROVISIONAL, 0)
+    full_calls = counts.get(PrescreenDecision.OUTCOME_FULL_CALL, 0)
+    return {
+        "screened": saved + full_calls,
+        "calls_saved": saved,
+        "full_calls": full_calls,
+    }
@@ -0,0 +1,196 @@
+import hmac
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "HTTP_X_PROFILE"
+
+# Stack frames from these paths are attributed to each part of the request
+# in the timing breakdown (first match wins).
+BREAKDOWN_PATHS = (
+    ("model_call", os.path.join("core", "model_router.py")),
+    ("orm", os.path.join("django", "db")),
+    ("serialization", os.path.join("rest_framework", "serializers.py")),
+    ("serialization", os.path.join("rest_framework", "fields.py")),
+    ("rendering", os.path.join("rest_framework", "renderers.py")),
+)
+
+
+class StackSampler:
+    """
+    Samples the call stack of one thread at a fixed interval from a background
+    thread and counts identical stacks, in the "folded" format used by
+    flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(names))] += 1
+
+    def folded(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _short_path(filename):
+    for marker in ("site-packages" + os.sep, str(settings.BASE_DIR) + os.sep):
+        index = filename.find(marker)
+        if index != -1:
+            return filename[index + len(marker):]
+    return filename
+
+
+class QueryRecorder:
+    """
+    Database execute wrapper that records the SQL and duration of each query.
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - started))
+
+    def summary(self, slowest=5):
+        by_sql = Counter(sql for sql, _ in self.queries)
+        return {
+            "count": len(self.queries),
+            "total_ms": round(sum(duration for _, duration in self.queries) * 1000, 2),
+            "duplicates": sum(count - 1 for count in by_sql.values() if count > 1),
+            "slowest": [
+                {"sql": sql[:500], "ms": round(duration * 1000, 2)}
+                for sql, duration in sorted(self.queries, key=lambda query: query[1], reverse=True)[:slowest]
+            ],
+        }
+
+
+def _breakdown(stacks, total_seconds):
+    """
+    Splits the request's wall time by where the sampled stacks were.
+    """
+    samples = sum(stacks.values())
+    if not samples:
+        return {}
+    counts = Counter()
+    for stack, count in stacks.items():
+        for part, path in BREAKDOWN_PATHS:
+            if path in stack:
+                counts[part] += count
+                break
+        else:
+            counts["other"] += count
+    return {part: round(total_seconds * 1000 * count / samples, 2) for part, count in counts.items()}
+
+
+class RequestProfilingMiddleware:
+    """
+    Profiles individual requests on demand and writes the result to
+    PROFILING['DIR']. A request is profiled when it sends an X-Profile header
+    matching PROFILING['TOKEN'], or at random with PROFILING['SAMPLE_RATE'].
+
+    Each profile is a pair of files: <name>.folded with the sampled stacks
+    (open it with flamegraph.pl or speedscope) and <name>.json with the view
+    name, status, query summary and timing breakdown.
+
+    With no token and a sample rate of 0 the middleware removes itself at
+    start-up, so it costs nothing when profiling is off.
+    """
+
+    def __init__(self, get_response):
+        config = settings.PROFILING
+        if not config['TOKEN'] and not config['SAMPLE_RATE']:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.token = config['TOKEN']
+        self.sample_rate = config['SAMPLE_RATE']
+        self.interval = config['INTERVAL_MS'] / 1000
+        self.directory = config['DIR']
+
+    def should_profile(self, request):
+        header = request.META.get(PROFILE_HEADER)
+        if header and self.token and hmac.compare_digest(header.encode(), self.token.encode()):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+
+        sampler = StackSampler(threading.get_ident(), self.interval)
+        recorder = QueryRecorder()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            started = time.perf_counter()
+            sampler.start()
+            try:
+                response = self.get_response(request)
+            finally:
+                sampler.stop()
+                elapsed = time.perf_counter() - started
+
+        try:
+            self.write_profile(request, response, sampler, recorder, elapsed)
+        except OSError as e:
+            logger.warning("Could not write request profile: %s", e)
+        return response
+
+    def write_profile(self, request, response, sampler, recorder, elapsed):
+        match = getattr(request, "resolver_match", None)
+        view_name = (match.view_name or match._func_path) if match else "unresolved"
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{view_name.replace(':', '.')}-{os.getpid()}-{threading.get_ident()}"
+
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, f"{name}.folded"), "w") as f:
+            f.write(sampler.folded())
+
+        queries = recorder.summary()
+        with open(os.path.join(self.directory, f"{name}.json"), "w") as f:
+            json.dump({
+                "view": view_name,
+                "method": request.method,
+                "path": request.path,
+                "status": response.status_code,
+                "total_ms": round(elapsed * 1000, 2),
+                "samples": sum(sampler.stacks.values()),
+                "interval_ms": self.interval * 1000,
+                "breakdown_ms": _breakdown(sampler.stacks, elapsed),
+                "queries": queries,
+            }, f, indent=2)
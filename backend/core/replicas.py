@@ -0,0 +1,172 @@
+import logging
+import random
+import threading
+import time
+from contextvars import ContextVar
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections, DatabaseError
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+PRIMARY = "default"
+
+# Set by ReplicaRoutingMiddleware for requests whose reads may go to a replica
+_replica_reads_allowed = ContextVar("replica_reads_allowed", default=False)
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias != PRIMARY]
+
+
+class ReplicaHealth:
+    """
+    Tracks which replicas are usable in this process. A replica is checked at
+    most once per REPLICAS['HEALTH_CHECK_INTERVAL'] seconds: it must accept a
+    connection and (if it is a standby) be no more than REPLICAS['MAX_LAG_SECONDS']
+    behind the primary.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._status = {}  # alias -> (healthy, checked_at)
+
+    def is_healthy(self, alias):
+        now = time.monotonic()
+        with self._lock:
+            healthy, checked_at = self._status.get(alias, (None, 0.0))
+            if healthy is not None and now - checked_at < settings.REPLICAS['HEALTH_CHECK_INTERVAL']:
+                return healthy
+            # Record the check time first so concurrent requests don't all re-check.
+            self._status[alias] = (bool(healthy), now)
+
+        healthy = self._check(alias)
+        with self._lock:
+            self._status[alias] = (healthy, time.monotonic())
+        return healthy
+
+    @staticmethod
+    def _check(alias):
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute(
+                    "SELECT CASE WHEN pg_is_in_recovery()"
+                    " THEN COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+                    " ELSE 0 END"
+                )
+                lag = float(cursor.fetchone()[0])
+        except DatabaseError as e:
+            logger.warning("Read replica %s is unavailable: %s", alias, e)
+            return False
+        if lag > settings.REPLICAS['MAX_LAG_SECONDS']:
+            logger.warning("Read replica %s is %.1fs behind the primary, not using it", alias, lag)
+            return False
+        return True
+
+
+health = ReplicaHealth()
+
+
+class ReadReplicaRouter:
+    """
+    Sends reads made while handling safe (GET/HEAD/OPTIONS) requests to a
+    healthy read replica, and everything else to the primary. Writes, locking
+    reads (select_for_update) and reads outside a request always use the
+    primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not _replica_reads_allowed.get():
+            return PRIMARY
+        candidates = replica_aliases()
+        random.shuffle(candidates)
+        for alias in candidates:
+            if health.is_healthy(alias):
+                return alias
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
+
+
+def _request_user_id(request):
+    """
+    The id of the user making the request: the session user, or the user in a
+    valid JWT access token. DRF authenticates in the view, after middleware
+    runs, so the token is checked here too (no database query is needed).
+    """
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return user.pk
+
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.exceptions import AuthenticationFailed
+    from rest_framework_simplejwt.settings import api_settings
+
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    if header is None:
+        return None
+    try:
+        raw_token = authentication.get_raw_token(header)
+        if raw_token is None:
+            return None
+        return authentication.get_validated_token(raw_token).get(api_settings.USER_ID_CLAIM)
+    except AuthenticationFailed:
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Allows replica reads for safe requests, except right after the user's
+    own writes: a successful unsafe request pins the user to the primary for
+    REPLICAS['PIN_SECONDS'], so they read their own writes even if the
+    replicas are lagging. The pin is a ReplicaPin row on the primary, so it
+    applies in every worker process and needs nothing from the client.
+    """
+
+    SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        use_replica = request.method in self.SAFE_METHODS and bool(replica_aliases())
+        if use_replica:
+            user_id = _request_user_id(request)
+            use_replica = user_id is None or not self.is_pinned(user_id)
+        token = _replica_reads_allowed.set(use_replica)
+        try:
+            response = self.get_response(request)
+        finally:
+            _replica_reads_allowed.reset(token)
+
+        if request.method not in self.SAFE_METHODS and response.status_code < 400 and replica_aliases():
+            # DRF has set request.user by now if the view authenticated the request.
+            user_id = _request_user_id(request)
+            if user_id is not None:
+                self.pin(user_id)
+        return response
+
+    @staticmethod
+    def is_pinned(user_id):
+        ReplicaPin = apps.get_model("core", "ReplicaPin")
+        return ReplicaPin.objects.using(PRIMARY).filter(user_id=user_id, pinned_until__gt=timezone.now()).exists()
+
+    @staticmethod
+    def pin(user_id):
+        ReplicaPin = apps.get_model("core", "ReplicaPin")
+        ReplicaPin.objects.using(PRIMARY).update_or_create(
+            user_id=user_id,
+            defaults={"pinned_until": timezone.now() + timedelta(seconds=settings.REPLICAS['PIN_SECONDS'])},
+        )
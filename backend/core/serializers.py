@@ -1,5 +1,7 @@
+from django.utils import timezone
+from django.utils.functional import cached_property
 from rest_framework import serializers
-from .models import Project, ProjectResponse
+from .models import Project, ProjectResponse, AssignmentOfTask
 
 class ProjectSerializer(serializers.ModelSerializer):
     user = serializers.ReadOnlyField(source='user.username')  # Only read, automatically set to the logged-in user
@@ -9,6 +11,123 @@ class ProjectSerializer(serializers.ModelSerializer):
         fields = '__all__'  # Includes all fields
 
 class ProjectResponseSerializer(serializers.ModelSerializer):
+    # Compressed text fields (see core.compression) read and write plain text.
+    detailed_description = serializers.CharField(allow_blank=True, allow_null=True, required=False)
+    plan = serializers.CharField(allow_blank=True, allow_null=True, required=False)
+    analysis = serializers.CharField()
+
     class Meta:
         model = ProjectResponse
-        fields = ['id', 'project', 'detailed_description', 'plan', 'analysis', 'feasibility_score', 'created_at']
+        fields = ['id', 'project', 'detailed_description', 'plan', 'analysis', 'feasibility_score', 'previous_feasibility_score', 'provisional', 'version', 'evaluated_at', 'created_at']
+
+
+class AssignmentOfTaskSerializer(serializers.ModelSerializer):
+    description = serializers.CharField()  # Stored compressed
+
+    class Meta:
+        model = AssignmentOfTask
+        fields = ['id', 'task', 'team_member_number', 'start_date_time', 'end_date_time', 'description', 'created_at']
+
+
+# Read-only serializers for the hot GET endpoints. They build the same output
+# as the ModelSerializers above directly, without per-field serializer objects.
+
+class ReadOnlySerializer(serializers.BaseSerializer):
+    """
+    Base for the read serializers: formats datetimes the way DRF's
+    DateTimeField does, looking up the current timezone once per serializer.
+    """
+
+    @cached_property
+    def timezone(self):
+        return timezone.get_current_timezone()
+
+    def format_datetime(self, value):
+        if value is None:
+            return None
+        if timezone.is_aware(value):
+            value = value.astimezone(self.timezone)
+        text = value.isoformat()
+        return text[:-6] + 'Z' if text.endswith('+00:00') else text
+
+
+class ProjectReadSerializer(ReadOnlySerializer):
+    """
+    Read-only output of ProjectSerializer. Expects the project's user to be
+    loaded with select_related('user').
+    """
+
+    def to_representation(self, project):
+        return {
+            'id': project.id,
+            'user': project.user.username,
+            'title': project.title,
+            'description': project.description,
+            'team_size': project.team_size,
+            'start_date': project.start_date.isoformat(),
+            'end_date': project.end_date.isoformat(),
+            'country': project.country,
+            'budget': f"{project.budget:.2f}",
+            'created_at': self.format_datetime(project.created_at),
+        }
+
+
+class ProjectResponseReadSerializer(ReadOnlySerializer):
+    """
+    Read-only output of ProjectResponseSerializer.
+    """
+
+    def to_representation(self, response):
+        return {
+            'id': response.id,
+            'project': response.project_id,
+            'detailed_description': response.detailed_description,
+            'plan': response.plan,
+            'analysis': response.analysis,
+            'feasibility_score': response.feasibility_score,
+            'previous_feasibility_score': response.previous_feasibility_score,
+            'provisional': response.provisional,
+            'version': response.version,
+            'evaluated_at': self.format_datetime(response.evaluated_at),
+            'created_at': self.format_datetime(response.created_at),
+        }
+
+
+class ProjectEvaluationReadSerializer(ReadOnlySerializer):
+    """
+    Read-only output for one version of a project's evaluation, current
+    (ProjectResponse) or earlier (ProjectEvaluation). With include_text=False
+    in the context the text fields are left out, so they can be deferred.
+    """
+
+    TEXT_FIELDS = ('detailed_description', 'plan', 'analysis')
+
+    def to_representation(self, evaluation):
+        data = {
+            'version': evaluation.version,
+            'current': isinstance(evaluation, ProjectResponse),
+            'feasibility_score': evaluation.feasibility_score,
+            'provisional': evaluation.provisional,
+            'evaluated_at': self.format_datetime(evaluation.evaluated_at),
+        }
+        if self.context.get('include_text', True):
+            for name in self.TEXT_FIELDS:
+                data[name] = getattr(evaluation, name)
+        return data
+
+
+class AssignmentOfTaskReadSerializer(ReadOnlySerializer):
+    """
+    Read-only output of AssignmentOfTaskSerializer.
+    """
+
+    def to_representation(self, assignment):
+        return {
+            'id': assignment.id,
+            'task': assignment.task,
+            'team_member_number': assignment.team_member_number,
+            'start_date_time': self.format_datetime(assignment.start_date_time),
+            'end_date_time': self.format_datetime(assignment.end_date_time),
+            'description': assignment.description,
+            'created_at': self.format_datetime(assignment.created_at),
+        }
@@ -1,3 +1,538 @@
-from django.test import TestCase
+import io
+import logging
+import os
+import tempfile
+import threading
+import time
+from datetime import date
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.views.main import ORDER_VAR
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from rest_framework.exceptions import Throttled
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from . import compression, log, model_router
+from .admission import admit_generation, release_generation
+from .log import NonBlockingRotatingFileHandler, NonBlockingStreamHandler
+from .management.commands.rescore import Command
+from .models import CompressionDictionary, Project, ProjectEvaluation, ProjectResponse, RateLimitBucket, InFlightGeneration, AssignmentOfTask, ModelRoutingDecision, ReplicaPin
+from .output_schema import ANALYSIS_SCHEMA, TASKS_SCHEMA, ModelOutputError, parse_model_output
+from .prescreen import training_data
+from .profiling import RequestProfilingMiddleware
+from .renderers import ORJSONRenderer
+from .replicas import ReplicaRoutingMiddleware, _request_user_id
+from .utils import create_project_tasks, generate_project_analysis
+from .validation import validate_assignments, AssignmentValidationError
+
+ADMISSION_LIMITS = {
+    'USER_BURST': 2,
+    'USER_PER_MINUTE': 0,
+    'GLOBAL_BURST': 10,
+    'GLOBAL_PER_MINUTE': 0,
+    'MAX_IN_FLIGHT': 5,
+    'IN_FLIGHT_TIMEOUT': 300,
+    'IN_FLIGHT_RETRY_AFTER': 5,
+}
+
+RESCORE_OPTIONS = {
+    "ids": None, "user": None, "created_after": None, "created_before": None,
+    "min_score": None, "max_score": None, "missing_only": False, "provisional_only": True,
+}
+
+STUB_ROUTING = {
+    **settings.MODEL_ROUTING,
+    'PROVIDER': 'stub',
+    'DEFAULT_MODEL': 'test/small',
+    'LARGE_MODEL': 'test/large',
+    'LATENCY_BUDGET_SECONDS': 10,
+    'LATENCY_PROBE_SECONDS': 300,
+    'RACE': False,
+    'STUB_LATENCY_SECONDS': 0,
+}
+
+
+def _assignment(member, start, end, task="Task"):
+    return {
+        "team_member_number": member,
+        "task": task,
+        "start_date_time": start,
+        "end_date_time": end,
+        "description": "Do the work.",
+    }
+
+
+class ValidateAssignmentsTests(SimpleTestCase):
+    def setUp(self):
+        self.project = Project(team_size=2, start_date=date(2025, 1, 1), end_date=date(2025, 1, 31))
+
+    def test_valid_plan_is_unchanged(self):
+        cleaned, issues = validate_assignments(self.project, [
+            _assignment(1, "2025-01-02T09:00:00", "2025-01-03T17:00:00"),
+            _assignment(2, "2025-01-02T09:00:00", "2025-01-04T17:00:00"),
+        ])
+        self.assertEqual(issues, [])
+        self.assertEqual(len(cleaned), 2)
+
+    def test_zero_length_task_is_dropped(self):
+        cleaned, issues = validate_assignments(self.project, [
+            _assignment(1, "2025-01-02T09:00:00", "2025-01-02T09:00:00"),
+        ])
+        self.assertEqual(cleaned, [])
+        self.assertIn("no duration", issues[0])
+
+    def test_inverted_interval_is_swapped(self):
+        cleaned, issues = validate_assignments(self.project, [
+            _assignment(1, "2025-01-05T09:00:00", "2025-01-02T09:00:00"),
+        ])
+        self.assertEqual(len(issues), 1)
+        self.assertLess(cleaned[0]["start_date_time"], cleaned[0]["end_date_time"])
+
+    def test_member_number_is_wrapped_into_team(self):
+        cleaned, issues = validate_assignments(self.project, [
+            _assignment(3, "2025-01-02T09:00:00", "2025-01-03T09:00:00"),
+        ])
+        self.assertEqual(cleaned[0]["team_member_number"], 1)
+        self.assertEqual(len(issues), 1)
+
+    def test_task_outside_window_is_moved_inside(self):
+        cleaned, issues = validate_assignments(self.project, [
+            _assignment(1, "2025-03-01T09:00:00", "2025-03-02T09:00:00"),
+        ])
+        self.assertEqual(len(issues), 1)
+        self.assertEqual(cleaned[0]["end_date_time"].date(), date(2025, 1, 31))
+
+    def test_overlap_is_pushed_back(self):
+        cleaned, issues = validate_assignments(self.project, [
+            _assignment(1, "2025-01-02T09:00:00", "2025-01-04T09:00:00", "First"),
+            _assignment(1, "2025-01-03T09:00:00", "2025-01-05T09:00:00", "Second"),
+        ])
+        self.assertEqual(len(issues), 1)
+        first, second = cleaned
+        self.assertEqual(second["start_date_time"], first["end_date_time"])
+
+    def test_unparseable_datetimes_are_reported(self):
+        cleaned, issues = validate_assignments(self.project, [
+            _assignment(1, "YYYY-MM-DDTHH:MM:SS", "YYYY-MM-DDTHH:MM:SS"),
+        ])
+        self.assertEqual(cleaned, [])
+        self.assertIn("ISO format", issues[0])
+
+    def test_reject_mode_raises(self):
+        with self.assertRaises(AssignmentValidationError) as raised:
+            validate_assignments(self.project, [
+                _assignment(1, "2025-01-02T09:00:00", "2025-01-02T09:00:00"),
+            ], repair=False)
+        self.assertEqual(len(raised.exception.issues), 1)
+
+
+class ParseModelOutputTests(SimpleTestCase):
+    def test_valid_json(self):
+        data = parse_model_output(
+            '{"detailed_description": "d", "plan": "p", "analysis": "a", "feasibility_score": 7}', ANALYSIS_SCHEMA
+        )
+        self.assertEqual(data["feasibility_score"], 7)
+
+    def test_chatter_and_trailing_comma_are_repaired(self):
+        data = parse_model_output(
+            'Here is the JSON: {"detailed_description": "d", "plan": "p", "analysis": "a", "feasibility_score": 7,}',
+            ANALYSIS_SCHEMA,
+        )
+        self.assertEqual(data["analysis"], "a")
+
+    def test_bracket_in_chatter_before_an_object(self):
+        data = parse_model_output('Sure [note]: {"detailed_description": "d", "plan": "p", "analysis": "a", '
+                                  '"feasibility_score": 7}', ANALYSIS_SCHEMA)
+        self.assertEqual(data["feasibility_score"], 7)
+
+    def test_truncated_output_is_closed(self):
+        data = parse_model_output(
+            '{"detailed_description": "d", "plan": "p", "feasibility_score": 6, "analysis": "cut off', ANALYSIS_SCHEMA
+        )
+        self.assertEqual(data["analysis"], "cut off")
+
+    def test_missing_required_field(self):
+        with self.assertRaises(ModelOutputError):
+            parse_model_output('{"detailed_description": "d", "plan": "p", "analysis": "cut off', ANALYSIS_SCHEMA)
+
+    def test_score_is_clamped_and_parsed_from_text(self):
+        data = parse_model_output(
+            '{"detailed_description": "d", "plan": "p", "analysis": "a", "feasibility_score": "12/10"}', ANALYSIS_SCHEMA
+        )
+        self.assertEqual(data["feasibility_score"], 10)
+
+    def test_non_finite_score_is_a_model_output_error(self):
+        for score in ("Infinity", "1e400", "NaN"):
+            with self.subTest(score=score), self.assertRaises(ModelOutputError):
+                parse_model_output(
+                    '{"detailed_description": "d", "plan": "p", "analysis": "a", "feasibility_score": %s}' % score,
+                    ANALYSIS_SCHEMA,
+                )
+
+    def test_single_task_object_becomes_a_list(self):
+        data = parse_model_output(
+            '{"team_member_number": 1, "task": "t", "start_date_time": "2025-01-01T09:00:00", '
+            '"end_date_time": "2025-01-02T09:00:00", "description": "d"}',
+            TASKS_SCHEMA,
+        )
+        self.assertEqual(len(data), 1)
+
+    def test_empty_output(self):
+        with self.assertRaises(ModelOutputError):
+            parse_model_output("", ANALYSIS_SCHEMA)
+
+
+@override_settings(PROFILING={**settings.PROFILING, 'TOKEN': 'secret', 'SAMPLE_RATE': 0})
+class ProfilingTokenTests(SimpleTestCase):
+    def setUp(self):
+        self.middleware = RequestProfilingMiddleware(lambda request: None)
+
+    def test_matching_token(self):
+        self.assertTrue(self.middleware.should_profile(RequestFactory().get("/", HTTP_X_PROFILE="secret")))
+
+    def test_non_ascii_header_is_rejected(self):
+        self.assertFalse(self.middleware.should_profile(RequestFactory().get("/", HTTP_X_PROFILE="sécret")))
+
+
+@override_settings(MODEL_ADMISSION=ADMISSION_LIMITS)
+class AdmissionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="admission", password="secret")
+
+    def user_tokens(self):
+        return RateLimitBucket.objects.get(key=f"user:{self.user.pk}").tokens
+
+    def test_burst_then_throttled(self):
+        release_generation(admit_generation(self.user))
+        release_generation(admit_generation(self.user))
+        with self.assertRaises(Throttled):
+            admit_generation(self.user)
+
+    def test_refund_returns_the_token(self):
+        generation_id = admit_generation(self.user)
+        self.assertEqual(self.user_tokens(), 1)
+        release_generation(generation_id, refund=True)
+        self.assertEqual(self.user_tokens(), 2)
+        self.assertFalse(InFlightGeneration.objects.exists())
+
+    def test_in_flight_cap(self):
+        with override_settings(MODEL_ADMISSION={**ADMISSION_LIMITS, 'MAX_IN_FLIGHT': 1}):
+            admit_generation(self.user)
+            with self.assertRaises(Throttled):
+                admit_generation(self.user)
+
+    def test_invalid_request_spends_no_token(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.post("/api/core/api/projects/", {"title": "Missing fields"}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(RateLimitBucket.objects.filter(key=f"user:{self.user.pk}").exists())
+
+    def test_infeasible_project_spends_no_token(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        project = Project.objects.create(
+            user=self.user, title="P", description="D", team_size=2, start_date=date(2025, 1, 1),
+            end_date=date(2025, 2, 1), country="Kenya", budget=100,
+        )
+        response = client.post("/api/core/api/projects/tasks/generate/", {"project_id": project.id}, format="json")
+        self.assertEqual(response.data, {"message": "not feasible"})
+        self.assertFalse(RateLimitBucket.objects.filter(key=f"user:{self.user.pk}").exists())
+
+    def test_prescreened_project_gets_its_token_back(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.post("/api/core/api/projects/", {
+            "title": "No budget", "description": "D", "team_size": 2, "start_date": "2025-01-01",
+            "end_date": "2025-02-01", "country": "Kenya", "budget": "0",
+        }, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.user_tokens(), 2)
+
+    @override_settings(MODEL_ROUTING=STUB_ROUTING)
+    def test_provisional_evaluation_is_reevaluated_by_the_model(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        project = Project.objects.create(
+            user=self.user, title="P", description="D", team_size=2, start_date=date(2025, 1, 1),
+            end_date=date(2025, 2, 1), country="Kenya", budget=0,
+        )
+        ProjectResponse.objects.create(
+            project=project, detailed_description="d", plan="p", analysis="a", feasibility_score=1, provisional=True,
+        )
+        self.assertEqual(list(Command().select_projects(RESCORE_OPTIONS)), [project])
+
+        response = client.post(f"/api/core/projects/{project.id}/reevaluate/")
+        self.assertEqual(response.status_code, 200)
+        evaluation = ProjectResponse.objects.get(project=project)
+        self.assertEqual((evaluation.provisional, evaluation.version), (False, 2))
+        self.assertEqual(ProjectEvaluation.objects.filter(project=project).count(), 1)
+        self.assertEqual(list(Command().select_projects(RESCORE_OPTIONS)), [])
+
+        response = client.post(f"/api/core/projects/{project.id}/reevaluate/")
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(MODEL_ROUTING=STUB_ROUTING)
+class ModelRouterTests(TestCase):
+    def setUp(self):
+        model_router._latency_ewma.clear()
+        model_router._probed_at.clear()
+        self.user = User.objects.create_user(username="router", password="secret")
+        self.project = Project.objects.create(
+            user=self.user, title="P", description="D", team_size=3, start_date=date(2025, 1, 1),
+            end_date=date(2025, 2, 1), country="Kenya", budget=1000,
+        )
+
+    def test_routing_choice(self):
+        self.assertEqual(model_router.route("short", self.project), ("test/small", "default"))
+        self.assertEqual(model_router.route("x" * 5000, self.project)[0], "test/large")
+        self.project.team_size = 20
+        self.assertEqual(model_router.route("short", self.project), ("test/large", "large team"))
+
+    def test_slow_model_falls_back_then_is_probed(self):
+        model_router.record_latency("test/small", 60)
+        model, reason = model_router.route("short", self.project)
+        self.assertEqual(model, "test/large")
+        self.assertIn("over latency budget", reason)
+
+        with override_settings(MODEL_ROUTING={**STUB_ROUTING, 'LATENCY_PROBE_SECONDS': 0}):
+            model, reason = model_router.route("short", self.project)
+            self.assertEqual(model, "test/small")
+            self.assertIn("probing", reason)
+            # The probe's sample replaces the stale average.
+            model_router.record_latency("test/small", 1)
+        self.assertEqual(model_router.latency_stats()["test/small"], 1)
+        self.assertEqual(model_router.route("short", self.project)[0], "test/small")
+
+    def test_race_returns_the_fastest_model_and_stops_the_other(self):
+        routing = {**STUB_ROUTING, 'RACE': True, 'STUB_LATENCY_SECONDS': {'test/large': 30}}
+        before = set(threading.enumerate())
+        with override_settings(MODEL_ROUTING=routing):
+            started = time.monotonic()
+            result = generate_project_analysis(self.project)
+            self.assertLess(time.monotonic() - started, 5)
+
+        self.assertIsNotNone(result)
+        decision = ModelRoutingDecision.objects.get()
+        self.assertEqual((decision.model, decision.reason), ("test/small", "race"))
+        for thread in set(threading.enumerate()) - before:
+            if not thread.name.startswith("ThreadPoolExecutor"):
+                continue
+            thread.join(timeout=5)
+            self.assertFalse(thread.is_alive())
+        self.assertNotIn("test/large", model_router.latency_stats())
+
+    def test_stub_output_creates_valid_tasks(self):
+        assignments = create_project_tasks(self.project.id)
+        self.assertEqual(len(assignments), 3)
+        self.assertEqual(AssignmentOfTask.objects.filter(project=self.project).count(), 3)
+
+
+class AdminChangeListTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username="admin", password="secret")
+        self.client.force_login(self.admin)
+        for country in ("Kenya", "Ghana"):
+            Project.objects.create(
+                user=self.admin, title=f"Project in {country}", description="D", team_size=2,
+                start_date=date(2025, 1, 1), end_date=date(2025, 2, 1), country=country, budget=100,
+            )
+
+    def test_cursor_is_left_out_of_other_links(self):
+        response = self.client.get("/admin/core/project/", {"before": "999"})
+        changelist = response.context["cl"]
+        self.assertEqual(changelist.keyset_cursor, 999)
+        self.assertNotIn("before", changelist.get_query_string({ORDER_VAR: "1"}))
+        self.assertNotIn("before", changelist.get_query_string({"country": "Kenya"}))
+
+    def test_search_by_country_and_username(self):
+        response = self.client.get("/admin/core/project/", {"q": "ghana"})
+        self.assertEqual([project.country for project in response.context["cl"].result_list], ["Ghana"])
+        response = self.client.get("/admin/core/project/", {"q": "admin"})
+        self.assertEqual(len(response.context["cl"].result_list), 2)
+
+    def test_compressed_text_is_searched_through_the_search_document(self):
+        model_admin = admin.site._registry[AssignmentOfTask]
+        with mock.patch.object(connection, "vendor", "postgresql"):
+            queryset, _ = model_admin.get_search_results(None, AssignmentOfTask.objects.all(), "irrigation")
+        self.assertIn('"search_document" @@', str(queryset.query))
+
+
+@mock.patch("core.replicas.health.is_healthy", return_value=False)
+@mock.patch("core.replicas.replica_aliases", return_value=["replica_1"])
+class ReplicaPinTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="writer", password="secret")
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+
+    def test_user_is_read_from_the_access_token(self, *mocks):
+        request = RequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+        self.assertEqual(_request_user_id(request), self.user.pk)
+        self.assertIsNone(_request_user_id(RequestFactory().get("/", HTTP_AUTHORIZATION="Bearer invalid")))
+
+    def test_write_pins_the_user_to_the_primary(self, *mocks):
+        self.assertFalse(ReplicaRoutingMiddleware.is_pinned(self.user.pk))
+        response = self.client.post("/api/core/api/projects/", {
+            "title": "No budget", "description": "D", "team_size": 2, "start_date": "2025-01-01",
+            "end_date": "2025-02-01", "country": "Kenya", "budget": "0",
+        }, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(ReplicaPin.objects.filter(user=self.user).exists())
+        self.assertTrue(ReplicaRoutingMiddleware.is_pinned(self.user.pk))
+
+    def test_failed_write_does_not_pin(self, *mocks):
+        self.client.post("/api/core/api/projects/", {"title": "Missing fields"}, format="json")
+        self.assertFalse(ReplicaPin.objects.exists())
+
+
+class ApiSchemaAndRenderingTests(SimpleTestCase):
+    def test_project_list_schema_uses_the_model_serializer(self):
+        from drf_yasg.generators import OpenAPISchemaGenerator
+        from backend.schema import api_info
+
+        schema = OpenAPISchemaGenerator(api_info).get_schema(request=None, public=True)
+        response = schema["paths"]["/core/api/projects/"]["get"]["responses"]["200"]
+        self.assertEqual(response["schema"]["items"]["$ref"], "#/definitions/Project")
+
+    def test_renderer_indents_when_asked(self):
+        renderer = ORJSONRenderer()
+        self.assertEqual(renderer.render({"a": 1}), b'{"a":1}')
+        self.assertEqual(renderer.render({"a": 1}, renderer_context={"indent": 4}), b'{\n  "a": 1\n}')
+        self.assertEqual(renderer.render({"a": 1}, "application/json; indent=2"), b'{\n  "a": 1\n}')
+
+
+class NonBlockingHandlerTests(SimpleTestCase):
+    @skipUnless(hasattr(os, "fork"), "needs fork()")
+    def test_child_process_still_logs(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "app.log")
+            handler = NonBlockingRotatingFileHandler(path)
+            record = logging.LogRecord("test", logging.INFO, __file__, 0, "from %s", ("child",), None)
+            pid = os.fork()
+            if pid == 0:
+                handler.handle(record)
+                handler.stop()
+                os._exit(0)
+            os.waitpid(pid, 0)
+            handler.stop()
+            with open(path) as f:
+                self.assertIn('"message":"from child"', f.read())
+
+    def test_record_is_not_changed_for_other_handlers(self):
+        handler = NonBlockingStreamHandler(io.StringIO())
+        self.addCleanup(handler.close)
+        record = logging.LogRecord("test", logging.INFO, __file__, 0, "from %s", ("caller",), None)
+        prepared = handler.prepare(record)
+        self.assertEqual((prepared.msg, prepared.args), ("from caller", None))
+        self.assertEqual((record.msg, record.args), ("from %s", ("caller",)))
+
+    def test_closed_handler_is_not_restarted_after_fork(self):
+        handler = NonBlockingStreamHandler(io.StringIO())
+        self.assertIn(handler, log._active_handlers)
+        handler.close()
+        self.assertNotIn(handler, log._active_handlers)
+
+
+class PrescreenTrainingDataTests(TestCase):
+    def test_score_at_the_threshold_is_not_feasible(self):
+        user = User.objects.create_user(username="trainer", password="secret")
+        for score in (5, 6):
+            project = Project.objects.create(
+                user=user, title=f"Scored {score}", description="D", team_size=2, start_date=date(2025, 1, 1),
+                end_date=date(2025, 2, 1), country="Kenya", budget=100,
+            )
+            ProjectResponse.objects.create(
+                project=project, detailed_description="d", plan="p", analysis="a", feasibility_score=score,
+            )
+        rows, labels = training_data()
+        self.assertEqual(sorted(labels), [0, 1])
+
+
+class CompressionTests(TestCase):
+    LONG_TEXT = "The project is feasible given the team size and the proposed timeline. " * 20
+
+    def setUp(self):
+        compression._dictionaries.clear()
+
+    def test_short_text_is_stored_plain(self):
+        stored = compression.compress_text("short", dictionary_id=0)
+        self.assertEqual(stored, b"\x00\x00short")
+        self.assertEqual(compression.decompress_text(stored), "short")
+
+    def test_long_text_round_trips_compressed(self):
+        stored = compression.compress_text(self.LONG_TEXT, dictionary_id=0)
+        self.assertEqual(stored[:2], compression.MARKER + compression.CODEC_DEFLATE)
+        self.assertLess(len(stored), len(self.LONG_TEXT))
+        self.assertEqual(compression.decompress_text(stored), self.LONG_TEXT)
+
+    def test_dictionary_round_trip(self):
+        data = compression.train_dictionary([self.LONG_TEXT, self.LONG_TEXT + " Extra words here."])
+        dictionary = CompressionDictionary.objects.create(data=data, sample_count=2)
+        stored = compression.compress_text(self.LONG_TEXT, dictionary_id=dictionary.pk)
+        self.assertEqual(int.from_bytes(stored[2:4], "big"), dictionary.pk)
+        self.assertEqual(compression.decompress_text(stored), self.LONG_TEXT)
+
+    def test_text_written_before_compression_is_read_as_is(self):
+        self.assertEqual(compression.decompress_text("café \\n".encode("utf-8")), "café \\n")
+
+    def test_unknown_codec(self):
+        with self.assertRaises(ValueError):
+            compression.decompress_text(b"\x00\x07data")
+
+    def test_model_field_and_values_list(self):
+        user = User.objects.create_user(username="compressed", password="secret")
+        project = Project.objects.create(
+            user=user, title="P", description="D", team_size=2, start_date=date(2025, 1, 1),
+            end_date=date(2025, 2, 1), country="Kenya", budget=100,
+        )
+        ProjectResponse.objects.create(
+            project=project, detailed_description="d", plan=self.LONG_TEXT, analysis="a", feasibility_score=6,
+        )
+        response = ProjectResponse.objects.get()
+        self.assertIsInstance(response.__dict__["plan"], compression.CompressedValue)
+        self.assertEqual(response.plan, self.LONG_TEXT)
+
+        # values_list() returns the stored bytes, which callers decompress themselves.
+        stored = ProjectResponse.objects.values_list("analysis", flat=True).get()
+        self.assertEqual(bytes(stored), b"\x00\x00a")
+        self.assertEqual(compression.decompress_text(stored), "a")
+
+    def test_default_and_bytes_values_round_trip(self):
+        user = User.objects.create_user(username="defaults", password="secret")
+        project = Project.objects.create(
+            user=user, title="P", description="D", team_size=2, start_date=date(2025, 1, 1),
+            end_date=date(2025, 2, 1), country="Kenya", budget=100,
+        )
+        ProjectResponse.objects.create(project=project, plan=b"plain text", feasibility_score=6)
+        response = ProjectResponse.objects.get()
+        self.assertEqual(response.analysis, "")
+        self.assertIsNone(response.detailed_description)
+        self.assertEqual(response.plan, "plain text")
+
+        copied = ProjectEvaluation.objects.create(
+            project=project, version=1, analysis=response.__dict__["plan"], feasibility_score=6,
+            evaluated_at=response.evaluated_at,
+        )
+        self.assertEqual(ProjectEvaluation.objects.get(pk=copied.pk).analysis, "plain text")
+
+    def test_superseded_evaluation_keeps_the_stored_text(self):
+        user = User.objects.create_user(username="history", password="secret")
+        project = Project.objects.create(
+            user=user, title="P", description="D", team_size=2, start_date=date(2025, 1, 1),
+            end_date=date(2025, 2, 1), country="Kenya", budget=100,
+        )
+        ProjectResponse.objects.create(project=project, plan=self.LONG_TEXT, analysis="first", feasibility_score=6)
+        response = ProjectResponse.objects.get()
+        archived = response.supersede({"analysis": "second", "feasibility_score": 8})
+        archived.save()
+        response.save()
+        self.assertEqual(ProjectEvaluation.objects.get().analysis, "first")
+        self.assertEqual(ProjectEvaluation.objects.get().plan, self.LONG_TEXT)
+        self.assertEqual((ProjectResponse.objects.get().analysis, ProjectResponse.objects.get().version), ("second", 2))
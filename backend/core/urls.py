@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ProjectViewSet, ProjectTasksAPIView, ProjectStatisticsDashboard, ProjectAIEvaluationApiView, GenerateProjectTasksApiView
+from .views import ProjectViewSet, ProjectTasksAPIView, ProjectStatisticsDashboard, ProjectAIEvaluationApiView, GenerateProjectTasksApiView, ProjectDetailApiView, ProjectEvaluationHistoryApiView, ProjectReevaluateApiView
 
 # Create a router for automatic URL mapping
 router = DefaultRouter()
@@ -11,5 +11,8 @@ urlpatterns = [
     path('api/project/<int:project_id>/tasks/', ProjectTasksAPIView.as_view(), name='get_project_tasks'),
     path('projects/statistics/', ProjectStatisticsDashboard.as_view(), name='project-statistics'),
     path('projects/<int:project_id>/ai-evaluation/', ProjectAIEvaluationApiView.as_view(), name='project-ai-evaluation'),
+    path('projects/<int:project_id>/reevaluate/', ProjectReevaluateApiView.as_view(), name='project-reevaluate'),
+    path('projects/<int:project_id>/evaluations/', ProjectEvaluationHistoryApiView.as_view(), name='project-evaluation-history'),
+    path('projects/<int:project_id>/detail/', ProjectDetailApiView.as_view(), name='project-detail-composite'),
     path('api/projects/tasks/generate/', GenerateProjectTasksApiView.as_view(), name='generate-project-tasks'),
 ]
@@ -1,25 +1,106 @@
 import json
-import os
-import re
-import replicate
+import logging
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django.conf import settings
-from .models import Project, ProjectResponse, AssignmentOfTask
-from django.utils.dateparse import parse_datetime
+from .models import Project, ProjectResponse, AssignmentOfTask, update_search_documents
+from .validation import validate_assignments, AssignmentValidationError
+from . import model_router
+from .log import log_context, log_model_output
+from .prescreen import prescreen
+from .output_schema import (
+    ANALYSIS_SCHEMA, TASKS_SCHEMA, ModelOutputError, build_reask_prompt, parse_model_output,
+)
 
-# Set the API token as an environment variable
-os.environ["REPLICATE_API_TOKEN"] = settings.REPLICATE_API_TOKEN
+logger = logging.getLogger(__name__)
 
 
-def analyse_project_details(project_id):
+def _generate_structured(request_payload, schema, project, prompt_name):
+    """
+    Sends the payload to the model picked by the router and parses its output
+    against the schema. Malformed output is first repaired locally; only if
+    that fails is the model asked once to fix the format of its previous answer.
+
+    Raises:
+        ModelOutputError: if the output still doesn't match the schema.
+    """
+    with log_context(project_id=getattr(project, "id", None), prompt=prompt_name):
+        result = model_router.generate(json.dumps(request_payload), schema, project, prompt_name)
+        log_model_output(logger, result.model, result.raw, failed=result.data is None)
+
+        if result.data is not None:
+            return result.data
+
+        logger.warning(
+            "Model output could not be repaired, asking the model to correct it",
+            extra={"model": result.model, "errors": result.errors},
+        )
+        model_router.record_reask(result)
+        retry_result = model_router.call_model(result.model, build_reask_prompt(result.raw, result.errors, schema))
+        log_model_output(logger, result.model, retry_result, stage="retry")
+        return parse_model_output(retry_result, schema)
+
+
+def analyse_project_details(project_id, skip_prescreen=False):
     """
     Analyzes a project's details using a Replicate model and stores the resulting
-    analysis in the ProjectResponse model.
+    analysis in the ProjectResponse model. With skip_prescreen the model is
+    always called, e.g. to replace a provisional evaluation.
     """
     # 1. Retrieve the project or return 404 if not found.
     project = get_object_or_404(Project, pk=project_id)
 
-    # 2. Build the payload with clear, professional, and detailed instructions.
+    # 2. Pre-screen locally: obviously infeasible projects get a provisional
+    #    evaluation without a model call; the rest are sent to the model.
+    screening = None if skip_prescreen else prescreen(project)
+    if screening is not None:
+        analysis_fields = {
+            "detailed_description": project.description,
+            "plan": "",
+            "analysis": screening.analysis,
+            "feasibility_score": screening.feasibility_score,
+            "provisional": True,
+        }
+    else:
+        analysis_fields = generate_project_analysis(project)
+        if analysis_fields is None:
+            return
+
+    # 3. Store the new evaluation, keeping the one it replaces as a ProjectEvaluation.
+    project_response, created = store_evaluation(project, analysis_fields)
+
+    logger.info(
+        "%s ProjectResponse for Project ID %s", "Created" if created else "Updated", project_id,
+        extra={"project_id": project_id},
+    )
+    return project_response
+
+
+def store_evaluation(project, fields):
+    """
+    Makes the given field values the project's current evaluation. An existing
+    ProjectResponse is archived as a ProjectEvaluation first, so re-evaluating
+    never loses an earlier analysis.
+
+    Returns:
+        (ProjectResponse, created)
+    """
+    with transaction.atomic():
+        project_response = ProjectResponse.objects.select_for_update().filter(project=project).first()
+        if project_response is None:
+            return ProjectResponse.objects.create(project=project, **fields), True
+
+        project_response.supersede(fields).save()
+        project_response.save()
+        return project_response, False
+
+
+def generate_project_analysis(project):
+    """
+    Calls the Replicate model to analyse a project and returns the ProjectResponse
+    field values without saving them, or None if the model output was unusable.
+    """
+    # 1. Build the payload with clear, professional, and detailed instructions.
     request_payload = {
         "prompt": {
             "instructions": [
@@ -53,52 +134,25 @@ def analyse_project_details(project_id):
     }
 
     try:
-        # 3. Use replicate.stream to call the model with our JSON-stringified prompt.
-        stream = replicate.stream(
-            "ibm-granite/granite-3.1-2b-instruct",
-            input={"prompt": json.dumps(request_payload)}
-        )
-        result = ""
-        for event in stream:
-            result += str(event)  # Convert each event to string before concatenating
-
-        # Debug: output the raw result for inspection.
-        print("Raw output from replicate model:", result)
-
-        # 4. Extract the JSON object using regex in case extra text is present.
-        match = re.search(r'\{.*\}', result, re.DOTALL)
-        json_str = match.group(0) if match else result
-
-        # 5. Parse the JSON string.
-        response_data = json.loads(json_str)
-
-    except json.JSONDecodeError as e:
-        print("JSON decode error:", e)
-        print("Raw output was:", result)
-        return
-    except Exception as e:
-        print(f"Error calling Replicate model: {e}")
-        return
-
-    # 6. Extract the analysis fields from the response.
-    detailed_description = response_data.get("detailed_description", "")
-    plan = response_data.get("plan", "")
-    analysis = response_data.get("analysis", "")
-    feasibility_score = response_data.get("feasibility_score", 0)
-
-    # 7. Create or update the ProjectResponse in the database.
-    project_response, created = ProjectResponse.objects.update_or_create(
-        project=project,
-        defaults={
-            "detailed_description": detailed_description,
-            "plan": plan,
-            "analysis": analysis,
-            "feasibility_score": feasibility_score,
-        }
-    )
+        # 2. Call the model and parse (or repair) its JSON output.
+        response_data = _generate_structured(request_payload, ANALYSIS_SCHEMA, project, "analysis")
+
+    except ModelOutputError as e:
+        logger.warning("Unusable output from model: %s", e, extra={"project_id": project.id})
+        return None
+    except Exception:
+        logger.exception("Error calling model", extra={"project_id": project.id})
+        return None
+
+    # 3. Extract the analysis fields from the response.
+    return {
+        "detailed_description": response_data.get("detailed_description", ""),
+        "plan": response_data.get("plan", ""),
+        "analysis": response_data.get("analysis", ""),
+        "feasibility_score": response_data["feasibility_score"],
+        "provisional": False,
+    }
 
-    print(f"{'Created' if created else 'Updated'} ProjectResponse for Project ID {project_id}")
-    return project_response
 
 def create_project_tasks(project_id):
     """
@@ -148,72 +202,39 @@ def create_project_tasks(project_id):
     }
 
     try:
-        # 3. Call the Replicate model using replicate.stream.
-        stream = replicate.stream(
-            "ibm-granite/granite-3.1-2b-instruct",
-            input={"prompt": json.dumps(request_payload)}
-        )
-        result = ""
-        for event in stream:
-            result += str(event)  # Convert each event to a string before concatenating.
-
-        # Debug: output the raw result.
-        print("Raw output from replicate model:", result)
+        # 3. Call the model and parse (or repair) its JSON output.
+        assignments = _generate_structured(request_payload, TASKS_SCHEMA, project, "tasks")
 
-        # 4. Extract the JSON output using regex to find either an object or array.
-        match = re.search(r'(\{.*\}|\[.*\])', result, re.DOTALL)
-        json_str = match.group(0) if match else result
-
-        # 5. Parse the JSON string.
-        response_data = json.loads(json_str)
-
-    except json.JSONDecodeError as e:
-        print("JSON decode error:", e)
-        print("Raw output was:", result)
+    except ModelOutputError as e:
+        logger.warning("Unusable output from model: %s", e, extra={"project_id": project.id})
         return None
-    except Exception as e:
-        print(f"Error calling Replicate model: {e}")
+    except Exception:
+        logger.exception("Error calling model", extra={"project_id": project.id})
         return None
 
-    # 6. Normalize the response: ensure assignments is a list.
-    if isinstance(response_data, list):
-        assignments = response_data
-    elif isinstance(response_data, dict):
-        assignments = [response_data]
-    else:
-        print("Unexpected response format:", response_data)
+    # 4. Validate (and, if configured, repair) the assignments before writing them.
+    try:
+        cleaned_assignments, issues = validate_assignments(
+            project,
+            assignments,
+            repair=settings.TASK_VALIDATION_MODE != "reject",
+        )
+    except AssignmentValidationError as e:
+        logger.warning("Rejected task assignments: %s", e, extra={"project_id": project_id})
         return None
 
-    created_assignments = []
-
-    # 7. Iterate over each assignment and create a database record in the correct format.
-    for assignment in assignments:
-        try:
-            team_member_number = int(assignment.get("team_member_number"))
-            task = assignment.get("task")
-            start_date_time_str = assignment.get("start_date_time")
-            end_date_time_str = assignment.get("end_date_time")
-            description = assignment.get("description")
-
-            # Convert datetime strings to datetime objects.
-            start_date_time = parse_datetime(start_date_time_str)
-            end_date_time = parse_datetime(end_date_time_str)
-            if start_date_time is None or end_date_time is None:
-                raise ValueError("Datetime fields are not in the correct ISO format (YYYY-MM-DDTHH:MM:SS).")
-
-            # Create the task assignment in the database.
-            task_assignment = AssignmentOfTask.objects.create(
-                project=project,
-                team_member_number=team_member_number,
-                task=task,
-                start_date_time=start_date_time,
-                end_date_time=end_date_time,
-                description=description
-            )
-            created_assignments.append(task_assignment)
-        except Exception as e:
-            print(f"Error creating task assignment from data {assignment}: {e}")
-            continue
-
-    print(f"Created {len(created_assignments)} task assignment(s) for Project ID {project_id}")
+    for issue in issues:
+        logger.info("Task assignment issue: %s", issue, extra={"project_id": project_id})
+
+    # 5. Store all validated assignments in a single write.
+    created_assignments = AssignmentOfTask.objects.bulk_create([
+        AssignmentOfTask(project=project, **assignment)
+        for assignment in cleaned_assignments
+    ])
+    update_search_documents(created_assignments)
+
+    logger.info(
+        "Created %d task assignment(s) for Project ID %s", len(created_assignments), project_id,
+        extra={"project_id": project_id},
+    )
     return created_assignments
@@ -0,0 +1,140 @@
+from collections import defaultdict
+from datetime import datetime, time
+
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+
+class AssignmentValidationError(ValueError):
+    """
+    Raised when generated task assignments cannot be stored as-is and
+    validation is running in "reject" mode (or the plan is beyond repair).
+    """
+
+    def __init__(self, issues):
+        self.issues = issues
+        super().__init__(f"{len(issues)} invalid task assignment(s): " + "; ".join(issues[:5]))
+
+
+def project_window(project):
+    """
+    Returns the (start, end) datetimes covering the whole project, from the
+    first second of start_date to the last second of end_date.
+    """
+    tz = timezone.get_current_timezone()
+    window_start = timezone.make_aware(datetime.combine(project.start_date, time.min), tz)
+    window_end = timezone.make_aware(datetime.combine(project.end_date, time.max.replace(microsecond=0)), tz)
+    return window_start, window_end
+
+
+def _as_aware(value):
+    """
+    Parses an ISO datetime string (or passes a datetime through) and makes it
+    timezone-aware so it can be compared against the project window.
+    """
+    parsed = value if isinstance(value, datetime) else parse_datetime(value or "")
+    if parsed is None:
+        return None
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, timezone.get_current_timezone())
+    return parsed
+
+
+def validate_assignments(project, assignments, repair=True):
+    """
+    Validates the raw assignments produced by the model before they are saved.
+
+    Each assignment is checked for parseable datetimes, a positive duration,
+    a team_member_number within the project's team size and a slot inside the
+    project window. Assignments are then indexed per team member and swept in
+    start order (O(n log n) overall) to detect double-booking.
+
+    With repair=True the problems are fixed in place: inverted intervals are
+    swapped, member numbers are wrapped into range, intervals are shifted and
+    clipped into the window and overlapping tasks are pushed back to start
+    when the member's previous task ends. Zero-length tasks and anything that
+    still cannot fit are dropped and reported. With repair=False any problem
+    raises AssignmentValidationError.
+
+    Returns:
+        tuple: (list of cleaned assignment dicts, list of issue strings).
+    """
+    window_start, window_end = project_window(project)
+    team_size = max(int(project.team_size or 0), 1)
+    issues = []
+    per_member = defaultdict(list)
+
+    # 1. Check each assignment on its own.
+    for index, assignment in enumerate(assignments):
+        label = f"assignment #{index + 1}"
+        if not isinstance(assignment, dict):
+            issues.append(f"{label}: not an object")
+            continue
+
+        start = _as_aware(assignment.get("start_date_time"))
+        end = _as_aware(assignment.get("end_date_time"))
+        if start is None or end is None:
+            issues.append(f"{label}: datetimes are not in ISO format (YYYY-MM-DDTHH:MM:SS)")
+            continue
+
+        try:
+            member = int(assignment.get("team_member_number"))
+        except (TypeError, ValueError):
+            issues.append(f"{label}: team_member_number is not a number")
+            continue
+
+        if member < 1 or member > team_size:
+            issues.append(f"{label}: team_member_number {member} outside 1..{team_size}")
+            member = (member - 1) % team_size + 1
+
+        if end < start:
+            issues.append(f"{label}: ends before it starts")
+            start, end = end, start
+        if end == start:
+            issues.append(f"{label}: has no duration, dropped")
+            continue
+
+        if start < window_start or end > window_end:
+            issues.append(f"{label}: falls outside the project window")
+            duration = end - start
+            if end <= window_start:
+                start, end = window_start, window_start + duration
+            elif start >= window_end:
+                start, end = window_end - duration, window_end
+            start, end = max(start, window_start), min(end, window_end)
+            if end <= start:
+                issues.append(f"{label}: no time left inside the project window, dropped")
+                continue
+
+        per_member[member].append({
+            "team_member_number": member,
+            "task": str(assignment.get("task") or "")[:255],
+            "start_date_time": start,
+            "end_date_time": end,
+            "description": assignment.get("description") or "",
+            "_label": label,
+        })
+
+    # 2. Sweep each member's interval list in start order to find overlaps.
+    cleaned = []
+    for member, intervals in per_member.items():
+        intervals.sort(key=lambda item: (item["start_date_time"], item["end_date_time"]))
+        busy_until = None
+        for item in intervals:
+            label = item.pop("_label")
+            if busy_until is not None and item["start_date_time"] < busy_until:
+                issues.append(f"{label}: overlaps another task for team member {member}")
+                duration = item["end_date_time"] - item["start_date_time"]
+                item["start_date_time"] = busy_until
+                item["end_date_time"] = min(busy_until + duration, window_end)
+                if item["end_date_time"] <= item["start_date_time"]:
+                    issues.append(f"{label}: no free slot left in the project window, dropped")
+                    continue
+            busy_until = item["end_date_time"]
+            cleaned.append(item)
+
+    if issues and not repair:
+        raise AssignmentValidationError(issues)
+
+    cleaned.sort(key=lambda item: (item["start_date_time"], item["team_member_number"]))
+    return cleaned, issues
@@ -1,34 +1,52 @@
 from rest_framework import viewsets, permissions
-from .serializers import ProjectSerializer, ProjectResponseSerializer
+from .serializers import (
+    ProjectSerializer, ProjectReadSerializer, ProjectResponseReadSerializer, AssignmentOfTaskReadSerializer,
+    ProjectEvaluationReadSerializer,
+)
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from django.shortcuts import get_object_or_404
-from .models import Project, ProjectResponse
+from .models import Project, ProjectResponse, ProjectEvaluation, AssignmentOfTask
 from .utils import analyse_project_details
-from django.db.models import Count, Q
+from django.db.models import Count, Q, Min, Max, Prefetch
 from .utils import create_project_tasks
+from .admission import ModelAdmissionMixin
 
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(ModelAdmissionMixin, viewsets.ModelViewSet):
     """
     API endpoint for creating, retrieving, updating, and deleting projects.
     """
-    queryset = Project.objects.all().order_by('-created_at')
+    queryset = Project.objects.select_related('user').order_by('-created_at')
     serializer_class = ProjectSerializer
     permission_classes = [permissions.IsAuthenticated]  # Only authenticated users can access
     http_method_names = ['get', 'post', 'delete']
 
+    def get_serializer_class(self):
+        # Reads use the lightweight serializer; creates still need validation.
+        # The schema generator gets the full serializer, which it can describe.
+        if self.action in ('list', 'retrieve') and not getattr(self, 'swagger_fake_view', False):
+            return ProjectReadSerializer
+        return ProjectSerializer
+
     def perform_create(self, serializer):
         """
         Associates the created project with the logged-in user,
         then calls the analysis function.
         """
-        # 1. Create and save the Project
+        # 1. The data is valid; take an admission token for the model call.
+        self.admit_model_call()
+
+        # 2. Create and save the Project
         project = serializer.save(user=self.request.user)
 
-        # 2. Call the analysis function (passes the ID of the newly created Project)
-        analyse_project_details(project_id=project.id)
+        # 3. Call the analysis function (passes the ID of the newly created Project)
+        project_response = analyse_project_details(project_id=project.id)
+
+        # 4. Provisional evaluations come from the local pre-screen, not the model.
+        if project_response is not None and project_response.provisional:
+            self.refund_model_call()
 
 
 class ProjectAIEvaluationApiView(APIView):
@@ -48,10 +66,136 @@ class ProjectAIEvaluationApiView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        serializer = ProjectResponseSerializer(project_response)
+        serializer = ProjectResponseReadSerializer(project_response)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+class ProjectReevaluateApiView(ModelAdmissionMixin, APIView):
+    permission_classes = [permissions.IsAuthenticated]  # Only authenticated users can access
+
+    def post(self, request, project_id):
+        """
+        Replaces a provisional evaluation (from the local pre-screen) with a
+        full model analysis. The provisional version is kept in the history.
+        """
+        project = get_object_or_404(Project, id=project_id, user=request.user)
+        project_response = ProjectResponse.objects.filter(project=project).first()
+        if project_response is None or not project_response.provisional:
+            return Response(
+                {"error": "Only a provisional evaluation can be re-evaluated."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        self.admit_model_call()
+        project_response = analyse_project_details(project_id=project.id, skip_prescreen=True)
+        if project_response is None:
+            return Response(
+                {"error": "The model output could not be used, please try again later."},
+                status=status.HTTP_502_BAD_GATEWAY
+            )
+
+        serializer = ProjectResponseReadSerializer(project_response)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class ProjectEvaluationHistoryApiView(APIView):
+    permission_classes = [permissions.IsAuthenticated]  # Only authenticated users can access
+
+    def get(self, request, project_id):
+        """
+        Lists every version of a project's AI evaluation, newest (current)
+        first. With ?text=0 only the scores and dates are returned and the
+        compressed text fields are not loaded at all.
+        """
+        project = get_object_or_404(Project, id=project_id)
+        include_text = request.query_params.get('text', '1') != '0'
+
+        versions = [
+            ProjectResponse.objects.filter(project=project),
+            ProjectEvaluation.objects.filter(project=project).order_by('-version'),
+        ]
+        if not include_text:
+            versions = [queryset.defer(*ProjectEvaluationReadSerializer.TEXT_FIELDS) for queryset in versions]
+
+        evaluations = [evaluation for queryset in versions for evaluation in queryset]
+        serializer = ProjectEvaluationReadSerializer(evaluations, many=True, context={'include_text': include_text})
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class ProjectDetailApiView(APIView):
+    permission_classes = [permissions.IsAuthenticated]  # Only authenticated users can access
+
+    TASK_MODES = ('full', 'summary', 'none')
+    DEFAULT_PAGE_SIZE = 50
+    MAX_PAGE_SIZE = 500
+
+    def get(self, request, project_id):
+        """
+        Returns a project together with its AI evaluation and task assignments
+        in one response, so the project page needs a single round trip.
+
+        Query parameters:
+            tasks: 'full' (default), 'summary' (per-member counts and time span)
+                   or 'none'.
+            page, page_size: paginate the tasks in 'full' mode.
+
+        The project, owner and evaluation come from one joined query; the tasks
+        cost one more query (two when paginated, for the total count).
+        """
+        tasks_mode = request.query_params.get('tasks', 'full')
+        if tasks_mode not in self.TASK_MODES:
+            return Response(
+                {"error": f"tasks must be one of: {', '.join(self.TASK_MODES)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        paginate = tasks_mode == 'full' and 'page' in request.query_params
+        try:
+            page = int(request.query_params.get('page', 1))
+            page_size = min(int(request.query_params.get('page_size', self.DEFAULT_PAGE_SIZE)), self.MAX_PAGE_SIZE)
+        except ValueError:
+            return Response({"error": "page and page_size must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+        if page < 1 or page_size < 1:
+            return Response({"error": "page and page_size must be positive"}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = Project.objects.select_related('response', 'user')
+        if tasks_mode == 'full' and not paginate:
+            queryset = queryset.prefetch_related(
+                Prefetch('assignments', queryset=AssignmentOfTask.objects.order_by('start_date_time', 'id'))
+            )
+        project = get_object_or_404(queryset, id=project_id)
+
+        data = {
+            "project": ProjectReadSerializer(project).data,
+            "evaluation": ProjectResponseReadSerializer(project.response).data if hasattr(project, 'response') else None,
+        }
+
+        if tasks_mode == 'full' and paginate:
+            tasks = AssignmentOfTask.objects.filter(project=project).order_by('start_date_time', 'id')
+            offset = (page - 1) * page_size
+            data["tasks"] = {
+                "count": tasks.count(),
+                "page": page,
+                "page_size": page_size,
+                "results": AssignmentOfTaskReadSerializer(tasks[offset:offset + page_size], many=True).data,
+            }
+        elif tasks_mode == 'full':
+            data["tasks"] = AssignmentOfTaskReadSerializer(project.assignments.all(), many=True).data
+        elif tasks_mode == 'summary':
+            data["tasks"] = list(
+                AssignmentOfTask.objects.filter(project=project)
+                .values('team_member_number')
+                .annotate(
+                    task_count=Count('id'),
+                    first_start=Min('start_date_time'),
+                    last_end=Max('end_date_time'),
+                )
+                .order_by('team_member_number')
+            )
+
+        return Response(data, status=status.HTTP_200_OK)
+
+
 class ProjectTasksAPIView(APIView):
     permission_classes = [permissions.IsAuthenticated]  # Only authenticated users can access
 
@@ -60,10 +204,7 @@ class ProjectTasksAPIView(APIView):
         project = get_object_or_404(Project, id=project_id)
 
         # Retrieve all tasks assigned to the project
-        tasks = list(project.assignments.all().values(
-            'id', 'task', 'team_member_number', 'start_date_time',
-            'end_date_time', 'description', 'created_at'
-        ))
+        tasks = AssignmentOfTaskReadSerializer(project.assignments.all(), many=True).data
 
         # Return only the associated tasks
         return Response(tasks, status=status.HTTP_200_OK)
@@ -86,7 +227,7 @@ class ProjectStatisticsDashboard(APIView):
         return Response(data, status=status.HTTP_200_OK)
 
 
-class GenerateProjectTasksApiView(APIView):
+class GenerateProjectTasksApiView(ModelAdmissionMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]  # Only authenticated users can access
 
     def post(self, request, *args, **kwargs):
@@ -102,6 +243,7 @@ class GenerateProjectTasksApiView(APIView):
             return Response({"message": "not feasible"}, status=status.HTTP_200_OK)
 
         # If the feasibility score is above five, return "ok"
+        self.admit_model_call()
         prompt = create_project_tasks(project.id)
 
         return Response({"message": "ok"}, status=status.HTTP_200_OK)
@@ -3,14 +3,21 @@
 # Exit immediately if a command exits with a non-zero status
 set -e
 
-# Apply database migrations
-echo "Making and applying database migrations..."
-python manage.py makemigrations --noinput
-python manage.py migrate --noinput
+if [ "${FAST_START:-0}" = "1" ]; then
+    # Fast start: static files and the OpenAPI schema were built into the
+    # image, so only apply the committed migrations (a no-op when up to date).
+    echo "Fast start: applying migrations..."
+    python manage.py migrate --noinput
+else
+    # Apply database migrations
+    echo "Making and applying database migrations..."
+    python manage.py makemigrations --noinput
+    python manage.py migrate --noinput
 
-# Collect static files
-echo "Collecting static files..."
-python manage.py collectstatic --noinput --clear
+    # Collect static files
+    echo "Collecting static files..."
+    python manage.py collectstatic --noinput --clear
+fi
 
 # Start Gunicorn server
 echo "Starting Gunicorn server..."